@@ -14,6 +14,7 @@ Configuration (sparkq.yml):
   queue_runner:
     base_url: http://192.168.1.100:5005  # Optional override; auto-detected if omitted
     poll_interval: 30                      # Seconds between polls in --watch mode
+    max_poll_interval: 120                 # Idle backoff cap in --watch mode (default: 4x poll_interval)
     lock_dir: /tmp                         # Optional override for lockfile directory (default: system temp or env SPARKQ_RUNNER_LOCK_DIR)
 
 Execution Modes:
@@ -24,7 +25,8 @@ Execution Modes:
 Smart Defaults:
   - base_url: Auto-detected from local IP + server.port if not in config
   - worker_id: Derived from hostname + queue name (e.g., worker-mybox-Back_End)
-  - poll_interval: 30 seconds (configurable via --poll or config file)
+  - poll_interval: 30 seconds (configurable via --poll or config file); --watch doubles the
+    wait after each empty poll up to max_poll_interval and drops back once work shows up
 
 Usage Examples:
   # Process all tasks in queue, then exit (default)
@@ -42,19 +44,26 @@ Usage Examples:
 
 import argparse
 import atexit
+import fcntl
 import json
 import os
+import random
 import signal
 import sys
 import time
-from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 import socket
 import tempfile
 
+try:
+    import orjson
+except ImportError:  # optional; falls back to Response.json()
+    orjson = None
+
 # Ensure we import from the package when executed as a script
 ROOT_DIR = Path(__file__).resolve().parent
 SRC_DIR = ROOT_DIR / "src"
@@ -66,13 +75,30 @@ if str(SRC_DIR) not in sys.path:
 from src.config import (  # type: ignore
     get_queue_runner_config as config_queue_runner_config,
     get_server_config as config_server_config,
-    load_config,
+    load_config_cached,
     resolve_base_url,
 )
 
 _DEFAULT_HTTP_REQUEST = requests.request
 _http_request = _DEFAULT_HTTP_REQUEST
 
+# Shared keep-alive session so poll/claim/complete calls reuse pooled connections.
+# Retries stay in _request_with_retry; the adapter does not add its own.
+_HTTP_SESSION = requests.Session()
+_HTTP_ADAPTER = HTTPAdapter(pool_connections=16, pool_maxsize=64)
+_HTTP_SESSION.mount("http://", _HTTP_ADAPTER)
+_HTTP_SESSION.mount("https://", _HTTP_ADAPTER)
+atexit.register(_HTTP_SESSION.close)
+
+
+def _json(resp) -> Any:
+    """Decode a JSON response body, straight from bytes with orjson when it is installed."""
+    content = getattr(resp, "content", None)
+    if orjson is not None and isinstance(content, bytes):
+        return orjson.loads(content)
+    return resp.json()
+
+
 def _timeout_kwargs(timeout: float) -> dict:
     """
     Return timeout kwargs for the current HTTP client.
@@ -94,10 +120,11 @@ def load_queue_runner_config():
     Returns dict with keys:
     - base_url (optional): Override for API URL
     - poll_interval (default 30): Seconds between polls in --watch mode
+    - max_poll_interval (default 4x poll_interval): Cap for idle backoff in --watch mode
 
     Returns empty dict if config file doesn't exist (all defaults apply).
     """
-    cfg = load_config()
+    cfg = load_config_cached()
     return config_queue_runner_config(cfg)
 
 
@@ -110,7 +137,7 @@ def get_server_config():
 
     Returns default if config file doesn't exist.
     """
-    cfg = load_config()
+    cfg = load_config_cached()
     return config_server_config(cfg)
 
 
@@ -125,7 +152,7 @@ def get_default_base_url():
     Auto-detection uses local IP (not localhost) so it works from other machines.
     Falls back to localhost if IP resolution fails.
     """
-    return resolve_base_url(load_config())
+    return resolve_base_url(load_config_cached())
 
 
 def resolve_worker_id(queue_name: str) -> str:
@@ -144,8 +171,9 @@ def resolve_worker_id(queue_name: str) -> str:
     return f"worker-{hostname}-{clean_queue_name}"
 
 
-# Global variable for lockfile path
+# Global lockfile path and the descriptor holding its flock
 LOCK_FILE = None
+LOCK_FD: Optional[int] = None
 
 
 def get_lock_dir() -> str:
@@ -176,43 +204,46 @@ def acquire_lock(queue_id: str) -> None:
     """
     Acquire lockfile or exit if already running.
 
-    Creates /tmp/sparkq-runner-{queue_id}.lock containing the PID.
-    Checks if another instance is running before proceeding.
+    Holds an exclusive flock on /tmp/sparkq-runner-{queue_id}.lock for the life of
+    the process; the kernel drops it when the process dies, so a leftover file from a
+    crashed runner never blocks a new one. The PID is written only for humans.
     Registers cleanup handlers for graceful shutdown.
     """
-    global LOCK_FILE
+    global LOCK_FILE, LOCK_FD
     LOCK_FILE = get_lock_path(queue_id)
 
-    # Check if lockfile exists
-    if os.path.exists(LOCK_FILE):
+    while True:
+        try:
+            fd = os.open(LOCK_FILE, os.O_CREAT | os.O_RDWR, 0o644)
+        except OSError as e:
+            log(f"ERROR: Failed to create lockfile: {e}")
+            sys.exit(1)
+
         try:
-            with open(LOCK_FILE, 'r') as f:
-                old_pid = int(f.read().strip())
-        except (ValueError, FileNotFoundError):
-            # Corrupt lockfile, remove it
-            os.remove(LOCK_FILE)
-        else:
-            # Check if process is alive
-            try:
-                os.kill(old_pid, 0)  # Signal 0 = check if process exists
-                # Process is alive - duplicate detected
-                log(f"ERROR: queue_runner already running for queue (PID {old_pid})")
-                log(f"Kill it first: kill {old_pid}")
-                log(f"Or wait for it to finish")
-                sys.exit(1)
-            except OSError:
-                # Process is dead, remove stale lock
-                log(f"Removing stale lockfile (PID {old_pid} no longer exists)")
-                os.remove(LOCK_FILE)
-
-    # Create lockfile with current PID
-    try:
-        with open(LOCK_FILE, 'w') as f:
-            f.write(str(os.getpid()))
-        log(f"Acquired lock: {LOCK_FILE}")
-    except IOError as e:
-        log(f"ERROR: Failed to create lockfile: {e}")
-        sys.exit(1)
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            old_pid = os.read(fd, 32).decode(errors="replace").strip() or "unknown"
+            os.close(fd)
+            log(f"ERROR: queue_runner already running for queue (PID {old_pid})")
+            log(f"Kill it first: kill {old_pid}")
+            log(f"Or wait for it to finish")
+            sys.exit(1)
+
+        # A previous holder may have unlinked the file between our open and flock;
+        # only a lock on the inode still at LOCK_FILE counts
+        held = os.fstat(fd)
+        try:
+            current = os.stat(LOCK_FILE)
+        except FileNotFoundError:
+            current = None
+        if current is not None and (current.st_dev, current.st_ino) == (held.st_dev, held.st_ino):
+            break
+        os.close(fd)
+
+    os.ftruncate(fd, 0)
+    os.write(fd, str(os.getpid()).encode())
+    LOCK_FD = fd
+    log(f"Acquired lock: {LOCK_FILE}")
 
     # Register cleanup handlers
     atexit.register(release_lock)
@@ -221,14 +252,22 @@ def acquire_lock(queue_id: str) -> None:
 
 
 def release_lock() -> None:
-    """Remove lockfile on exit."""
-    global LOCK_FILE
-    if LOCK_FILE and os.path.exists(LOCK_FILE):
-        try:
+    """Remove lockfile and drop the flock on exit."""
+    global LOCK_FD
+    if LOCK_FD is None:
+        return
+    # Unlink before closing so no newcomer can lock the file we are about to remove
+    try:
+        if LOCK_FILE:
             os.remove(LOCK_FILE)
-            # Don't log here - might be called during shutdown
-        except OSError:
-            pass  # Best effort
+        # Don't log here - might be called during shutdown
+    except OSError:
+        pass  # Best effort
+    try:
+        os.close(LOCK_FD)
+    except OSError:
+        pass
+    LOCK_FD = None
 
 
 def handle_signal(signum, _frame):
@@ -248,6 +287,8 @@ def _request_with_retry(
     *,
     retries: int = 2,
     backoff_seconds: float = 1.0,
+    jitter: float = 0.5,
+    max_delay: float = 30.0,
     context: Optional[Dict[str, Any]] = None,
     allowed_statuses: Optional[set[int]] = None,
     raise_for_status: bool = True,
@@ -256,9 +297,16 @@ def _request_with_retry(
     """
     Execute an HTTP request with limited retries and structured logging.
 
-    Retries on network errors or 5xx responses (unless status allowed).
+    Retries on network errors or 5xx responses (unless status allowed). Backoff is
+    exponential with +/- jitter (fraction of the delay), capped at max_delay, so runners
+    that fail together do not retry in lockstep.
     """
     allowed = allowed_statuses or set()
+
+    def backoff_delay(attempt: int) -> float:
+        delay = backoff_seconds * (2 ** attempt) * (1 + random.uniform(-jitter, jitter))
+        return min(max_delay, delay)
+
     attempt = 0
     last_exc: Optional[Exception] = None
     while attempt <= retries:
@@ -267,11 +315,13 @@ def _request_with_retry(
                 request_callable = _http_request
             else:
                 request_callable = getattr(requests, "request", _DEFAULT_HTTP_REQUEST)
+                if request_callable is _DEFAULT_HTTP_REQUEST:
+                    request_callable = _HTTP_SESSION.request
             response = request_callable(method=method, url=url, **kwargs)
             status = response.status_code
             if status >= 500 and status not in allowed and attempt < retries:
                 log(f"HTTP {method} {url} -> {status}; context={context} retrying ({attempt+1}/{retries})")
-                time.sleep(backoff_seconds * (2 ** attempt))
+                time.sleep(backoff_delay(attempt))
                 attempt += 1
                 continue
             if raise_for_status and status not in allowed:
@@ -282,7 +332,7 @@ def _request_with_retry(
             if attempt >= retries:
                 break
             log(f"HTTP {method} error for {url}; context={context}; retrying ({attempt+1}/{retries})")
-            time.sleep(backoff_seconds * (2 ** attempt))
+            time.sleep(backoff_delay(attempt))
             attempt += 1
         else:
             break
@@ -301,7 +351,7 @@ def fetch_queues(base_url: str) -> list[dict]:
         context={"action": "fetch_queues", "base_url": base_url},
         **_timeout_kwargs(10),
     )
-    return resp.json().get("queues", [])
+    return _json(resp).get("queues", [])
 
 
 def resolve_queue(base_url: str, name_or_id: str) -> Optional[dict]:
@@ -326,16 +376,19 @@ def resolve_queue(base_url: str, name_or_id: str) -> Optional[dict]:
     return None
 
 
-def fetch_tasks(base_url: str, queue_id: str) -> list[dict]:
-    """Fetch all tasks for a queue from the API."""
+def fetch_tasks(base_url: str, queue_id: str, status: Optional[str] = None) -> list[dict]:
+    """Fetch tasks for a queue from the API, optionally filtered by status server-side."""
+    params = {"queue_id": queue_id}
+    if status:
+        params["status"] = status
     resp = _request_with_retry(
         "GET",
         f"{base_url}/api/tasks",
-        params={"queue_id": queue_id},
+        params=params,
         context={"action": "fetch_tasks", "queue_id": queue_id},
         **_timeout_kwargs(10),
     )
-    return resp.json().get("tasks", [])
+    return _json(resp).get("tasks", [])
 
 
 def claim_task(base_url: str, task_id: str, worker_id: str) -> Optional[dict]:
@@ -362,7 +415,7 @@ def claim_task(base_url: str, task_id: str, worker_id: str) -> Optional[dict]:
     if resp.status_code == 409:
         return None
     resp.raise_for_status()
-    return resp.json().get("task")
+    return _json(resp).get("task")
 
 
 def complete_task(
@@ -434,7 +487,7 @@ def fetch_queue_info(queue_id: str, base_url: str) -> dict:
             context={"action": "fetch_queue_info", "queue_id": queue_id},
             **_timeout_kwargs(10),
         )
-        return resp.json().get("queue", {})
+        return _json(resp).get("queue", {})
     except requests.RequestException as e:
         raise RuntimeError(f"Failed to fetch queue {queue_id}: {e}")
 
@@ -460,14 +513,16 @@ def display_queue_instructions(queue: dict) -> None:
 
 def process_one(base_url: str, queue: dict, worker_id: str, execute: bool = True) -> bool:
     queue_id = queue["id"]
-    tasks = fetch_tasks(base_url, queue_id)
-    # Oldest-first: sort by created_at ascending
-    tasks = sorted(tasks, key=lambda t: t.get("created_at") or "")
-    queued = [t for t in tasks if (t.get("status") or "").lower() == "queued"]
-    if not queued:
+    # Only queued tasks are candidates, so let the API filter them instead of shipping the
+    # queue's whole history (and its list limit) over the wire on every poll
+    tasks = fetch_tasks(base_url, queue_id, status="queued")
+    # Oldest-first: created_at is ISO-8601, so string order is time order; min() is a single
+    # pass and, like a stable sort, keeps the first task among equal timestamps
+    queued = (t for t in tasks if (t.get("status") or "").lower() == "queued")
+    task = min(queued, key=lambda t: t.get("created_at") or "", default=None)
+    if task is None:
         return False
 
-    task = queued[0]
     task_id = task["id"]
     tool_name = task.get("tool_name", "llm-haiku")
 
@@ -540,6 +595,13 @@ def process_one(base_url: str, queue: dict, worker_id: str, execute: bool = True
     return True  # Made progress (task is now running or completed)
 
 
+def _next_poll_delay(prev: float, did_work: bool, *, min_s: float, max_s: float) -> float:
+    """Adaptive watch-mode delay: halve toward min_s after work, double toward max_s when idle."""
+    if did_work:
+        return max(min_s, prev / 2)
+    return min(max_s, prev * 2)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Run SparkQ tasks for a specified queue.",
@@ -584,11 +646,12 @@ def main():
     base_url = get_default_base_url()
 
     # Get poll interval from config if not specified via CLI
+    qr_config = load_queue_runner_config()
     if args.poll is None:
-        qr_config = load_queue_runner_config()
         poll_interval = qr_config.get("poll_interval", 30.0)
     else:
         poll_interval = args.poll
+    max_poll_interval = max(poll_interval, qr_config.get("max_poll_interval", poll_interval * 4))
 
     # Resolve queue first
     queue = resolve_queue(base_url, args.queue)
@@ -622,13 +685,15 @@ def main():
         sys.exit(0)
 
     if args.watch:
-        log(f"Mode: Continuous polling (poll every {poll_interval}s) (--watch)")
+        log(f"Mode: Continuous polling (poll every {poll_interval}s, backing off to {max_poll_interval}s when idle) (--watch)")
         log("Press Ctrl+C to stop")
+        delay = poll_interval
         try:
             while True:
                 did_work = process_one(base_url, queue, worker_id)
                 if not did_work:
-                    time.sleep(poll_interval)
+                    time.sleep(delay)
+                delay = _next_poll_delay(delay, did_work, min_s=poll_interval, max_s=max_poll_interval)
         except KeyboardInterrupt:
             log("Interrupted by user. Exiting.")
             sys.exit(0)
@@ -7,12 +7,12 @@ import time
 from contextlib import asynccontextmanager
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Any, Awaitable, Callable, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional, Union
 
 from fastapi import Body, FastAPI, HTTPException, Query, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse, Response
+from fastapi.responses import FileResponse, PlainTextResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, ConfigDict
 
@@ -25,9 +25,10 @@ from .constants import (
 )
 from .config import get_database_path, load_config
 from .agent_roles import build_prompt_with_role
+from .api_helpers import _error_response, _serialize_task as _serialize_task_fields
 from .errors import ConflictError, NotFoundError, SparkQError, ValidationError
 from .index import ScriptIndex
-from .models import TaskStatus
+from .models import TaskPayload, TaskStatus
 from .paths import get_build_prompts_dir, get_ui_dir, get_config_path
 from .storage import Storage, now_iso
 from .tools import get_registry, reload_registry
@@ -513,16 +514,6 @@ def _validate_config_value(namespace: str, key: str, value: Any):
     raise HTTPException(status_code=400, detail=f"Unsupported config namespace/key: {namespace}/{key}")
 
 
-def _format_error(message: Optional[str]) -> str:
-    if not message:
-        return "Error: Internal server error"
-    return message if str(message).startswith("Error:") else f"Error: {message}"
-
-
-def _error_response(message: Optional[str], status_code: int) -> JSONResponse:
-    return JSONResponse({"error": _format_error(message), "status": status_code}, status_code=status_code)
-
-
 def _status_code_for_error(exc: Exception) -> int:
     if isinstance(exc, NotFoundError):
         return 404
@@ -615,6 +606,10 @@ class TaskCreateRequest(BaseModel):
     agent_role_key: Optional[str] = None
 
 
+class TaskBulkCreateRequest(BaseModel):
+    tasks: List[TaskCreateRequest]
+
+
 class TaskClaimRequest(BaseModel):
     worker_id: Optional[str] = None
 
@@ -629,6 +624,19 @@ class TaskFailRequest(BaseModel):
     error_type: Optional[str] = None
 
 
+class TaskTransition(BaseModel):
+    action: Literal["claim", "complete", "fail", "requeue"]
+    worker_id: Optional[str] = None
+    result_summary: Optional[str] = None
+    result_data: Optional[str] = None
+    error_message: Optional[str] = None
+    error_type: Optional[str] = None
+
+
+class TaskTransitionsRequest(BaseModel):
+    actions: List[TaskTransition]
+
+
 class TaskResetRequest(BaseModel):
     target_status: Optional[str] = "running"
 
@@ -663,22 +671,6 @@ class ToolPayload(BaseModel):
     task_class: str
 
 
-class TaskPayload(BaseModel):
-    prompt: Optional[str] = None
-    raw_prompt: Optional[str] = None
-    prompt_path: Optional[str] = None
-    script_path: Optional[str] = None
-    args: Optional[List[str]] = None
-    metadata: Optional[Dict[str, Any]] = None
-    queue_instructions: Optional[str] = None
-    agent_role_key: Optional[str] = None
-    agent_role_label: Optional[str] = None
-    agent_role_description: Optional[str] = None
-    mode: Optional[str] = None
-
-    model_config = ConfigDict(extra="allow")
-
-
 class TaskOut(BaseModel):
     id: str
     queue_id: str
@@ -727,6 +719,10 @@ class TasksResponse(BaseModel):
     max_limit: Optional[int] = None
 
 
+class TasksBulkResponse(BaseModel):
+    tasks: List[TaskOut]
+
+
 class SessionOut(BaseModel):
     id: str
     project_id: str
@@ -796,6 +792,10 @@ class MessageResponse(BaseModel):
     message: str
 
 
+class CountResponse(BaseModel):
+    count: int
+
+
 @app.post("/api/config/validate")
 def validate_config(payload: ConfigUpdateRequest):
     """Dry-run validation for config payload (expects {value}) without persisting."""
@@ -877,75 +877,8 @@ class AgentRoleUpdateRequest(BaseModel):
 
 
 def _serialize_task(task: Dict[str, Any], queue_names: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
-    """Normalize task fields for API responses."""
-    serialized = dict(task)
-
-    # Friendly ID: <QUEUE>-<last4>
-    queue_name = None
-    queue_id = serialized.get("queue_id")
-    if queue_id:
-        if queue_names:
-            queue_name = queue_names.get(queue_id)
-        if queue_name is None:
-            queue_obj = storage.get_queue(queue_id)
-            queue_name = queue_obj["name"] if queue_obj else None
-    friendly_prefix = (queue_name or queue_id or "TASK")
-    friendly_prefix = friendly_prefix.upper()
-    short_id = (str(serialized.get("id") or "")[-4:] or "0000")
-    serialized["friendly_id"] = f"{friendly_prefix}-{short_id}"
-
-    serialized.setdefault("claimed_at", serialized.get("started_at"))
-
-    finished_at = serialized.get("finished_at")
-    status = serialized.get("status")
-    if status == "succeeded":
-        serialized.setdefault("completed_at", finished_at)
-        serialized.setdefault("failed_at", None)
-    elif status == "failed":
-        serialized.setdefault("failed_at", finished_at)
-        serialized.setdefault("completed_at", None)
-    else:
-        serialized.setdefault("completed_at", None)
-        serialized.setdefault("failed_at", None)
-
-    if "result_summary" not in serialized and "result" in serialized:
-        serialized["result_summary"] = serialized.get("result")
-    if "error_message" not in serialized and "error" in serialized:
-        serialized["error_message"] = serialized.get("error")
-    payload_obj: Optional[Dict[str, Any]] = None
-    payload_data: Optional[TaskPayload] = None
-    payload = serialized.get("payload")
-    if isinstance(payload, str):
-        try:
-            payload_obj = json.loads(payload)
-        except Exception:
-            payload_obj = None
-
-    if "prompt_preview" not in serialized:
-        preview = None
-        if payload_obj is not None:
-            preview = payload_obj.get("prompt") or payload_obj.get("prompt_text") or payload_obj.get("prompt_path")
-        elif isinstance(payload, str):
-            preview = payload
-        serialized["prompt_preview"] = preview
-
-    if payload_obj:
-        serialized.setdefault("prompt", payload_obj.get("prompt"))
-        serialized.setdefault("raw_prompt", payload_obj.get("raw_prompt"))
-        serialized.setdefault("agent_role_key", payload_obj.get("agent_role_key") or serialized.get("agent_role_key"))
-        if payload_obj.get("agent_role_label"):
-            serialized.setdefault("agent_role_label", payload_obj.get("agent_role_label"))
-        if payload_obj.get("agent_role_description"):
-            serialized.setdefault("agent_role_description", payload_obj.get("agent_role_description"))
-        try:
-            payload_data = TaskPayload.model_validate(payload_obj)
-        except Exception:
-            payload_data = None
-
-    if payload_data:
-        serialized["payload_data"] = payload_data.model_dump()
-
-    return serialized
+    """Normalize task fields for API responses, looking up uncached queue names in storage."""
+    return _serialize_task_fields(task, queue_names, get_queue=storage.get_queue)
 
 
 @app.get("/health")
@@ -1218,6 +1151,14 @@ def get_queue(queue_id: str) -> QueueResponse:
     return {"queue": queue}
 
 
+@app.get("/api/queues/{queue_id}/count", response_model=CountResponse)
+def count_queue_tasks(queue_id: str) -> CountResponse:
+    """Return the number of tasks in a queue without fetching the rows."""
+    if not storage.get_queue(queue_id):
+        raise HTTPException(status_code=404, detail="Queue not found")
+    return {"count": storage.count_tasks(queue_id=queue_id)}
+
+
 @app.put("/api/queues/{queue_id}", response_model=QueueResponse)
 def update_queue(queue_id: str, request: QueueUpdateRequest) -> QueueResponse:
     fields_set = request.model_fields_set or set()
@@ -1365,17 +1306,21 @@ def delete_queue(queue_id: str) -> MessageResponse:
     return {"message": "Queue deleted"}
 
 
-@app.get("/api/tasks", response_model=TasksResponse)
+@app.get("/api/tasks", response_model=Union[TasksResponse, CountResponse])
 def list_tasks(
     queue_id: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     limit: int = Query(100, ge=1),
     offset: int = Query(0, ge=0),
-) -> TasksResponse:
+    count_only: bool = Query(False),
+) -> Union[TasksResponse, CountResponse]:
     if status and status not in TASK_STATUS_VALUES:
         allowed_statuses = ", ".join(sorted(TASK_STATUS_VALUES))
         raise HTTPException(status_code=400, detail=f"Invalid status filter. Allowed values: {allowed_statuses}")
 
+    if count_only:
+        return {"count": storage.count_tasks(queue_id=queue_id, status=status)}
+
     effective_limit = min(limit, storage.max_task_list_limit)
     truncated = limit > storage.max_task_list_limit
 
@@ -1401,22 +1346,34 @@ def list_tasks(
     return response
 
 
+def _task_create_spec(request: TaskCreateRequest) -> Dict[str, Any]:
+    """Resolve timeout, agent role, and payload JSON for a task create request."""
+    registry = get_registry()
+    timeout = registry.get_timeout(request.tool_name, override=request.timeout, task_class=request.task_class)
+    role = _resolve_agent_role(request.agent_role_key)
+
+    payload_data = {"prompt_path": request.prompt_path, "metadata": request.metadata}
+    if role:
+        payload_data["agent_role_key"] = role["key"]
+        payload_data["agent_role_label"] = role.get("label")
+
+    return {
+        "queue_id": request.queue_id,
+        "tool_name": request.tool_name,
+        "task_class": request.task_class,
+        "payload": json.dumps(payload_data),
+        "timeout": timeout,
+        "agent_role_key": role["key"] if role else None,
+    }
+
+
 @app.post("/api/tasks", response_model=TaskResponse)
-def create_task(request: TaskCreateRequest) -> TaskResponse:
+def create_task(request: TaskCreateRequest, id_only: bool = Query(False)) -> TaskResponse:
     queue = storage.get_queue(request.queue_id)
     if not queue:
         raise HTTPException(status_code=404, detail="Queue not found")
 
-    registry = get_registry()
-    timeout = registry.get_timeout(request.tool_name, override=request.timeout, task_class=request.task_class)
-    role = _resolve_agent_role(request.agent_role_key)
-
     if _CREATE_HAS_PAYLOAD:
-        payload_data = {"prompt_path": request.prompt_path, "metadata": request.metadata}
-        if role:
-            payload_data["agent_role_key"] = role["key"]
-            payload_data["agent_role_label"] = role.get("label")
-        payload_json = json.dumps(payload_data)
         metadata_value: Optional[str] = None
         if request.metadata is not None:
             metadata_value = (
@@ -1424,16 +1381,14 @@ def create_task(request: TaskCreateRequest) -> TaskResponse:
             )
 
         task = storage.create_task(
-            queue_id=request.queue_id,
-            tool_name=request.tool_name,
-            task_class=request.task_class,
-            payload=payload_json,
-            timeout=timeout,
+            **_task_create_spec(request),
             prompt_path=request.prompt_path,
             metadata=metadata_value,
-            agent_role_key=role["key"] if role else None,
         )
     else:
+        registry = get_registry()
+        timeout = registry.get_timeout(request.tool_name, override=request.timeout, task_class=request.task_class)
+        role = _resolve_agent_role(request.agent_role_key)
         task = storage.create_task(
             queue_id=request.queue_id,
             tool_name=request.tool_name,
@@ -1444,9 +1399,27 @@ def create_task(request: TaskCreateRequest) -> TaskResponse:
             agent_role_key=role["key"] if role else None,
         )
 
+    if id_only:
+        # Callers that only need the new id skip serializing the full task
+        return PlainTextResponse(task["id"])
     return {"task": _serialize_task(task)}
 
 
+@app.post("/api/tasks/bulk", response_model=TasksBulkResponse)
+def create_tasks_bulk(request: TaskBulkCreateRequest) -> TasksBulkResponse:
+    """Create many tasks in one request and one database transaction."""
+    if not request.tasks:
+        raise HTTPException(status_code=400, detail="At least one task is required")
+
+    queue_ids = {item.queue_id for item in request.tasks}
+    queue_names = storage.get_queue_names(list(queue_ids))
+    if queue_ids - queue_names.keys():
+        raise HTTPException(status_code=404, detail="Queue not found")
+
+    tasks = storage.create_tasks_bulk([_task_create_spec(item) for item in request.tasks])
+    return {"tasks": [_serialize_task(task, queue_names) for task in tasks]}
+
+
 @app.get("/api/tasks/{task_id}", response_model=TaskResponse)
 def get_task(task_id: str) -> TaskResponse:
     task = storage.get_task(task_id)
@@ -1562,6 +1535,41 @@ def requeue_task(task_id: str) -> TaskResponse:
     return {"task": _serialize_task(new_task)}
 
 
+def _apply_transition(task_id: str, transition: TaskTransition) -> Dict[str, Any]:
+    if transition.action == "claim":
+        return claim_task(task_id, TaskClaimRequest(worker_id=transition.worker_id))
+    if transition.action == "complete":
+        return complete_task(
+            task_id,
+            TaskCompleteRequest(result_summary=transition.result_summary or "", result_data=transition.result_data),
+        )
+    if transition.action == "fail":
+        return fail_task(
+            task_id,
+            TaskFailRequest(error_message=transition.error_message or "", error_type=transition.error_type),
+        )
+    return requeue_task(task_id)
+
+
+@app.post("/api/tasks/{task_id}/transitions", response_model=TaskResponse)
+def apply_task_transitions(task_id: str, request: TaskTransitionsRequest) -> TaskResponse:
+    """Apply a sequence of claim/complete/fail/requeue actions in one transaction.
+
+    Each action runs through the same handler as its single-action endpoint. A requeue
+    moves later actions onto the new task it creates. Any failing action rolls back
+    the whole sequence. Returns the task after the last action.
+    """
+    if not request.actions:
+        raise HTTPException(status_code=400, detail="At least one action is required")
+
+    response: Dict[str, Any] = {}
+    with storage.bulk_transaction():
+        for transition in request.actions:
+            response = _apply_transition(task_id, transition)
+            task_id = response["task"]["id"]
+    return response
+
+
 @app.post("/api/tasks/{task_id}/rerun", response_model=TaskResponse)
 def rerun_task(task_id: str) -> TaskResponse:
     try:
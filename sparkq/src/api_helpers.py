@@ -0,0 +1,120 @@
+"""Error-formatting and task-serialization helpers for the HTTP API.
+
+Kept free of the FastAPI app and storage so they can be imported (and unit tested)
+without loading src.api.
+"""
+
+import json
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+from starlette.responses import JSONResponse
+
+from .models import TaskPayload
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json via JSONResponse otherwise
+    orjson = None
+
+
+@lru_cache(maxsize=256)
+def _format_error(message: Optional[str]) -> str:
+    if not message:
+        return "Error: Internal server error"
+    return message if str(message).startswith("Error:") else f"Error: {message}"
+
+
+if orjson is not None:
+
+    class _ErrorJSONResponse(JSONResponse):
+        """JSONResponse rendered with orjson; same compact bytes as the stdlib path."""
+
+        def render(self, content: Any) -> bytes:
+            return orjson.dumps(content)
+
+else:
+    _ErrorJSONResponse = JSONResponse
+
+
+def _error_response(message: Optional[str], status_code: int) -> JSONResponse:
+    return _ErrorJSONResponse({"error": _format_error(message), "status": status_code}, status_code=status_code)
+
+
+def _serialize_task(
+    task: Dict[str, Any],
+    queue_names: Optional[Dict[str, str]] = None,
+    get_queue: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None,
+) -> Dict[str, Any]:
+    """Normalize task fields for API responses.
+
+    Queue names come from queue_names when prefetched, else from get_queue (if given).
+    """
+    serialized = dict(task)
+
+    # Friendly ID: <QUEUE>-<last4>
+    queue_name = None
+    queue_id = serialized.get("queue_id")
+    if queue_id:
+        if queue_names:
+            queue_name = queue_names.get(queue_id)
+        if queue_name is None and get_queue is not None:
+            queue_obj = get_queue(queue_id)
+            queue_name = queue_obj["name"] if queue_obj else None
+    friendly_prefix = (queue_name or queue_id or "TASK")
+    friendly_prefix = friendly_prefix.upper()
+    short_id = (str(serialized.get("id") or "")[-4:] or "0000")
+    serialized["friendly_id"] = f"{friendly_prefix}-{short_id}"
+
+    serialized.setdefault("claimed_at", serialized.get("started_at"))
+
+    finished_at = serialized.get("finished_at")
+    status = serialized.get("status")
+    if status == "succeeded":
+        serialized.setdefault("completed_at", finished_at)
+        serialized.setdefault("failed_at", None)
+    elif status == "failed":
+        serialized.setdefault("failed_at", finished_at)
+        serialized.setdefault("completed_at", None)
+    else:
+        serialized.setdefault("completed_at", None)
+        serialized.setdefault("failed_at", None)
+
+    if "result_summary" not in serialized and "result" in serialized:
+        serialized["result_summary"] = serialized.get("result")
+    if "error_message" not in serialized and "error" in serialized:
+        serialized["error_message"] = serialized.get("error")
+    payload_obj: Optional[Dict[str, Any]] = None
+    payload_data: Optional[TaskPayload] = None
+    payload = serialized.get("payload")
+    if isinstance(payload, str):
+        try:
+            payload_obj = json.loads(payload)
+        except Exception:
+            payload_obj = None
+
+    if "prompt_preview" not in serialized:
+        preview = None
+        if payload_obj is not None:
+            preview = payload_obj.get("prompt") or payload_obj.get("prompt_text") or payload_obj.get("prompt_path")
+        elif isinstance(payload, str):
+            preview = payload
+        serialized["prompt_preview"] = preview
+
+    if payload_obj:
+        serialized.setdefault("prompt", payload_obj.get("prompt"))
+        serialized.setdefault("raw_prompt", payload_obj.get("raw_prompt"))
+        serialized.setdefault("agent_role_key", payload_obj.get("agent_role_key") or serialized.get("agent_role_key"))
+        if payload_obj.get("agent_role_label"):
+            serialized.setdefault("agent_role_label", payload_obj.get("agent_role_label"))
+        if payload_obj.get("agent_role_description"):
+            serialized.setdefault("agent_role_description", payload_obj.get("agent_role_description"))
+        try:
+            payload_data = TaskPayload.model_validate(payload_obj)
+        except Exception:
+            payload_data = None
+
+    if payload_data:
+        serialized["payload_data"] = payload_data.model_dump()
+
+    return serialized
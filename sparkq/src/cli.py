@@ -90,6 +90,18 @@ def _emit_error(message: str, suggestion: Optional[str] = None, valid_options=No
     raise typer.Exit(1)
 
 
+def _emit_task_json(task_id: Optional[str], queue: Optional[str], status: Optional[str], **extra):
+    """Print a single-line JSON summary of a task for `--json` callers."""
+    import json
+
+    typer.echo(json.dumps({"task_id": task_id, "queue": queue, "status": status, **extra}))
+
+
+def _queue_name_for(task: dict) -> Optional[str]:
+    queue = get_storage().get_queue(task["queue_id"])
+    return queue["name"] if queue else None
+
+
 def _config_error(details: str):
     _emit_error(f"Configuration error: {details}", f"Check {get_config_path().name}")
 
@@ -762,6 +774,7 @@ def enqueue(
     timeout: Optional[int] = typer.Option(None, "--timeout", help="Timeout override in seconds"),
     prompt_file: Optional[str] = typer.Option(None, "--prompt-file", "-p", help="Path to prompt file"),
     metadata: Optional[str] = typer.Option(None, "--metadata", "-m", help="JSON metadata"),
+    as_json: bool = typer.Option(False, "--json", help="Emit machine-readable JSON"),
 ):
     """Enqueue task to queue."""
     import json
@@ -858,6 +871,10 @@ def enqueue(
         agent_role_key=agent_role.get("key") if agent_role else None,
     )
 
+    if as_json:
+        _emit_task_json(task["id"], queue, task["status"], tool=tool)
+        return
+
     typer.echo(f"Task {task['id']} enqueued to queue '{queue}'")
 
 
@@ -872,6 +889,7 @@ def peek(
         "-s",
         help="Queue name (stream alias supported)",
     ),
+    as_json: bool = typer.Option(False, "--json", help="Emit machine-readable JSON"),
 ):
     """Check next task in queue."""
     if not queue or not queue.strip():
@@ -887,6 +905,13 @@ def peek(
     # Get oldest queued task
     task = get_storage().get_oldest_queued_task(st['id'])
 
+    if as_json:
+        if not task:
+            _emit_task_json(None, queue, None)
+        else:
+            _emit_task_json(task["id"], queue, task["status"], tool=task["tool_name"])
+        return
+
     if not task:
         typer.echo("No queued tasks")
         return
@@ -919,6 +944,7 @@ def claim(
         "-s",
         help="Queue name (optional - shows available if omitted)",
     ),
+    as_json: bool = typer.Option(False, "--json", help="Emit machine-readable JSON"),
 ):
     """Claim next task in queue."""
     if not queue or not queue.strip():
@@ -945,12 +971,19 @@ def claim(
     task = get_storage().get_oldest_queued_task(st['id'])
 
     if not task:
+        if as_json:
+            _emit_task_json(None, queue, None)
+            return
         typer.echo(f"No queued tasks in queue '{queue}'")
         return
 
     # Claim the task
     claimed_task = get_storage().claim_task(task['id'])
 
+    if as_json:
+        _emit_task_json(claimed_task["id"], st["name"], claimed_task["status"], tool=claimed_task["tool_name"])
+        return
+
     # Output task details with queue instructions
     typer.echo(f"Task {claimed_task['id']}: {claimed_task['tool_name']}")
     typer.echo(f"Queue: {st['name']}")
@@ -983,6 +1016,7 @@ def complete(
     ),
     stdout: Optional[str] = typer.Option(None, "--stdout", help="Captured stdout"),
     stderr: Optional[str] = typer.Option(None, "--stderr", help="Captured stderr"),
+    as_json: bool = typer.Option(False, "--json", help="Emit machine-readable JSON"),
 ):
     """Mark task as completed."""
     import json
@@ -1051,6 +1085,10 @@ def complete(
     # Complete the task
     get_storage().complete_task(task_id, result_summary, result_data, stdout, stderr)
 
+    if as_json:
+        _emit_task_json(task_id, _queue_name_for(task), TaskStatus.SUCCEEDED.value)
+        return
+
     typer.echo(f"Task {task_id} marked as succeeded")
 
 
@@ -1062,6 +1100,7 @@ def fail(
     error_type: Optional[str] = typer.Option(None, "--error-type", help="Error type (optional)"),
     stdout: Optional[str] = typer.Option(None, "--stdout", help="Captured stdout"),
     stderr: Optional[str] = typer.Option(None, "--stderr", help="Captured stderr"),
+    as_json: bool = typer.Option(False, "--json", help="Emit machine-readable JSON"),
 ):
     """Mark task as failed."""
     if not task_id or not task_id.strip():
@@ -1083,6 +1122,10 @@ def fail(
 
     get_storage().fail_task(task_id, error, error_type=error_type, stdout=stdout, stderr=stderr)
 
+    if as_json:
+        _emit_task_json(task_id, _queue_name_for(task), TaskStatus.FAILED.value)
+        return
+
     typer.echo(f"Task {task_id} marked as failed")
 
 
@@ -1172,6 +1215,7 @@ def task(
 @cli_handler
 def requeue(
     task_id: str = typer.Argument(..., help="Task ID"),
+    as_json: bool = typer.Option(False, "--json", help="Emit machine-readable JSON"),
 ):
     """Move task back to queued status."""
     if not task_id or not task_id.strip():
@@ -1191,6 +1235,10 @@ def requeue(
     # Requeue the task (creates new task with fresh ID)
     new_task = get_storage().requeue_task(task_id)
 
+    if as_json:
+        _emit_task_json(new_task["id"], _queue_name_for(new_task), new_task["status"], requeued_from=task_id)
+        return
+
     typer.echo(f"Task {task_id} requeued as {new_task['id']}")
 
 
@@ -2,13 +2,20 @@
 
 from __future__ import annotations
 
+import copy
 import logging
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Optional
 import socket
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as _YamlLoader  # libyaml-backed when PyYAML was built with it
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 from .paths import get_config_path, get_default_db_path, reset_paths_cache
 
 logger = logging.getLogger(__name__)
@@ -28,11 +35,37 @@ def load_config(path: Path | str | None = None) -> Dict[str, Any]:
     if not config_path.exists():
         return {}
     try:
-        with open(config_path) as f:
-            return yaml.safe_load(f) or {}
-    except Exception as exc:
+        data = config_path.read_bytes()
+    except OSError as exc:
         logger.error("Failed to load config from %s: %s", config_path, exc)
         raise ValueError(f"Failed to load config at {config_path}: {exc}") from exc
+    return parse_config(data, config_path)
+
+
+def parse_config(data: bytes, source: Path | str) -> Dict[str, Any]:
+    """Parse sparkq.yml content already read from source; errors surface like load_config's."""
+    try:
+        return yaml.load(data, Loader=_YamlLoader) or {}
+    except Exception as exc:
+        logger.error("Failed to load config from %s: %s", source, exc)
+        raise ValueError(f"Failed to load config at {source}: {exc}") from exc
+
+
+@lru_cache(maxsize=8)
+def _parse_config_cached(config_path: str, data: bytes) -> Dict[str, Any]:
+    """Parse config once per distinct file content; the bytes read are both key and input."""
+    return parse_config(data, config_path)
+
+
+def load_config_cached(path: Path | str | None = None) -> Dict[str, Any]:
+    """load_config() that skips re-parsing sparkq.yml while its content is unchanged."""
+    config_path = Path(path) if path is not None else get_config_path()
+    try:
+        data = config_path.read_bytes()
+    except OSError:
+        return load_config(config_path)
+    # Copy so callers can't mutate the cached parse
+    return copy.deepcopy(_parse_config_cached(str(config_path), data))
 
 
 def get_database_path(config: Optional[Dict[str, Any]] = None) -> str:
@@ -13,6 +13,9 @@ TASK_CLASS_TIMEOUTS = {
 
 # Database defaults
 DB_LOCK_TIMEOUT_SECONDS = 5.0
+# Per-connection prepared-statement cache (sqlite3 default is 128). Keep it large:
+# bulk_transaction() reuses one connection across many repeated statements.
+DB_CACHED_STATEMENTS = 512
 MAX_TASK_LIST_LIMIT = 1000
 
 # Stale task handling
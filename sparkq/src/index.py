@@ -2,8 +2,12 @@
 
 import json
 import logging
+import os
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from .config import load_config
 from .constants import TASK_CLASS_TIMEOUTS
@@ -11,6 +15,9 @@ from .paths import get_config_path
 
 logger = logging.getLogger(__name__)
 
+# Marks build() candidates whose cached entry could not be reused
+_UNPARSED = object()
+
 
 class ScriptIndex:
     """Builds an in-memory index of scripts and their metadata."""
@@ -18,20 +25,47 @@ class ScriptIndex:
     SCRIPT_EXTENSIONS = {".sh", ".bash", ".py", ".rb", ".pl", ".js"}
     METADATA_KEYS = {"name", "description", "inputs", "outputs", "tags", "timeout", "task_class"}
     COMMENT_PREFIXES = ("#", "//")
-
-    def __init__(self, config_path: str | None = None):
+    COMMENT_PREFIXES_BYTES = (b"#", b"//")
+    # Joins name/description/tags into one search haystack; never appears in a field
+    SEARCH_FIELD_SEPARATOR = "\x00"
+    # Header lines are matched as bytes; only captured values are decoded
+    COMMENT_LINE_RE = re.compile(rb"(?:#|//)(.*)", re.S)
+    METADATA_KEY_RE = re.compile(
+        rb"\s*(" + b"|".join(key.encode() for key in sorted(METADATA_KEYS)) + rb")\s*:(.*)",
+        re.I | re.S,
+    )
+    # One read of this size covers the header block of nearly every script
+    HEADER_READ_BYTES = 4096
+    # Below this many files to parse, thread start-up costs more than it saves
+    PARALLEL_PARSE_MIN_FILES = 32
+    CACHE_SCHEMA_SQL = (
+        "CREATE TABLE IF NOT EXISTS scripts "
+        "(path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, entry_json TEXT)"
+    )
+
+    def __init__(self, config_path: str | None = None, cache_path: str | None = None):
         # Resolve config path at runtime to honor current working directory
         resolved = Path(config_path) if config_path is not None else get_config_path()
         self.config_path = Path(resolved)
+        # Optional SQLite file persisting parsed entries across processes; falls back to the
+        # script_index_cache config key (relative to the config file) when not given
+        self.cache_path = Path(cache_path) if cache_path is not None else None
         self.index: List[Dict[str, Any]] = []
+        # path -> (st_mtime_ns, st_size, entry or None); lets rebuild() skip unchanged files
+        self._cache: Dict[str, tuple] = {}
+        # Search/lookup structures derived from self.index (see _lookups)
+        self._lookup_source: Optional[List[Dict[str, Any]]] = None
+        self._haystacks: List[tuple] = []
+        self._by_name: Dict[str, Dict[str, Any]] = {}
 
     def _load_config(self) -> Dict[str, Any]:
         """Load YAML config, returning an empty dict on any error."""
         return load_config(self.config_path)
 
-    def _resolve_script_dirs(self) -> List[Path]:
+    def _resolve_script_dirs(self, config: Optional[Dict[str, Any]] = None) -> List[Path]:
         """Return configured script directories as absolute paths."""
-        config = self._load_config()
+        if config is None:
+            config = self._load_config()
         raw_dirs = config.get("script_dirs") or ["scripts"]
         if isinstance(raw_dirs, (str, Path)):
             raw_dirs = [raw_dirs]
@@ -46,6 +80,57 @@ class ScriptIndex:
 
         return resolved_dirs
 
+    def _resolve_cache_path(self, config: Dict[str, Any]) -> Optional[Path]:
+        """Return the persistent index cache file, or None when persistence is off."""
+        if self.cache_path is not None:
+            return self.cache_path
+        raw_path = config.get("script_index_cache")
+        if not raw_path:
+            return None
+        path = Path(raw_path).expanduser()
+        if not path.is_absolute():
+            path = self.config_path.parent / path
+        return path
+
+    def _load_persisted_cache(self, cache_path: Path) -> Dict[str, tuple]:
+        """Read path -> (st_mtime_ns, st_size, entry or None) rows from the cache file."""
+        try:
+            conn = sqlite3.connect(cache_path)
+            try:
+                conn.execute(self.CACHE_SCHEMA_SQL)
+                rows = conn.execute("SELECT path, mtime_ns, size, entry_json FROM scripts").fetchall()
+            finally:
+                conn.close()
+            return {path: (mtime_ns, size, json.loads(entry_json)) for path, mtime_ns, size, entry_json in rows}
+        except (sqlite3.Error, ValueError) as exc:
+            logger.warning(f"Ignoring unreadable script index cache {cache_path}: {exc}")
+            return {}
+
+    def _persist_cache(self, cache_path: Path, previous: Dict[str, tuple]) -> None:
+        """Write cache rows that changed since previous and drop rows for vanished files."""
+        changed = [
+            (path, cached[0], cached[1], json.dumps(cached[2]))
+            for path, cached in self._cache.items()
+            if previous.get(path, (None, None))[:2] != cached[:2]
+        ]
+        removed = [(path,) for path in previous if path not in self._cache]
+        if not changed and not removed:
+            return
+
+        try:
+            conn = sqlite3.connect(cache_path)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                with conn:
+                    conn.execute(self.CACHE_SCHEMA_SQL)
+                    conn.executemany("INSERT OR REPLACE INTO scripts VALUES (?, ?, ?, ?)", changed)
+                    conn.executemany("DELETE FROM scripts WHERE path = ?", removed)
+            finally:
+                conn.close()
+        except sqlite3.Error as exc:
+            logger.warning(f"Could not update script index cache {cache_path}: {exc}")
+
     def _coerce_metadata_value(self, key: str, raw_value: str) -> Any:
         """Convert metadata string values into richer types when needed."""
         if key == "tags":
@@ -84,7 +169,7 @@ class ScriptIndex:
 
         return raw_value
 
-    def _validate_metadata(self, file_path: Path, metadata: Dict[str, Any]) -> None:
+    def _validate_metadata(self, file_path: str | Path, metadata: Dict[str, Any]) -> None:
         """Log warnings for potentially malformed metadata."""
         # Warn if timeout is 0 or negative
         timeout = metadata.get("timeout")
@@ -100,73 +185,95 @@ class ScriptIndex:
         if task_class and task_class not in TASK_CLASS_TIMEOUTS:
             logger.warning(f"Script {file_path} has unknown task_class: {task_class}")
 
+    def _read_header_bytes(self, file_path: str | Path) -> bytes:
+        """Read the leading bytes of a script that hold its comment header.
+
+        Uses raw os.open/os.read; headers longer than one HEADER_READ_BYTES chunk keep
+        reading until the comment block ends or the file does.
+        """
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            header = os.read(fd, self.HEADER_READ_BYTES)
+            chunk_len = len(header)
+            while chunk_len == self.HEADER_READ_BYTES and not self._header_complete(header):
+                chunk = os.read(fd, self.HEADER_READ_BYTES)
+                header += chunk
+                chunk_len = len(chunk)
+        finally:
+            os.close(fd)
+        return header
+
+    def _header_complete(self, header: bytes) -> bool:
+        """Return True once header holds a full non-comment line (the end of the metadata block)."""
+        for line in header.split(b"\n")[:-1]:
+            stripped = line.strip()
+            if stripped and not stripped.startswith(self.COMMENT_PREFIXES_BYTES):
+                return True
+        return False
+
     def parse_script_header(self, file_path: Path) -> Dict[str, Any]:
         """Parse key/value metadata from comment headers at the top of a script."""
+        try:
+            header = self._read_header_bytes(file_path)
+        except OSError:
+            return {}
+        return self.parse_script_header_bytes(header, file_path)
+
+    def parse_script_header_bytes(self, header: bytes, file_path: str | Path) -> Dict[str, Any]:
+        """Parse key/value metadata from the raw leading bytes of a script."""
         metadata: Dict[str, Any] = {}
         current_key = None
         current_value_parts = []
 
-        try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as handle:
-                for line in handle:
-                    stripped = line.strip()
-
-                    # Empty lines are allowed in metadata block
-                    if not stripped:
-                        continue
-
-                    # Stop at first non-comment line
-                    if not stripped.startswith(self.COMMENT_PREFIXES):
-                        # Finalize any pending metadata
-                        if current_key:
-                            metadata[current_key] = self._coerce_metadata_value(
-                                current_key, " ".join(current_value_parts)
-                            )
-                        break
-
-                    # Strip comment prefix
-                    comment_body = stripped
-                    for prefix in self.COMMENT_PREFIXES:
-                        if comment_body.startswith(prefix):
-                            comment_body = comment_body[len(prefix) :]
-                            break
-
-                    comment_body = comment_body.lstrip("! ").strip()
-
-                    # Skip empty comments
-                    if not comment_body:
-                        continue
-
-                    # Check if this is a new key:value pair
-                    if ":" in comment_body:
-                        # Finalize previous key if exists
-                        if current_key:
-                            metadata[current_key] = self._coerce_metadata_value(
-                                current_key, " ".join(current_value_parts)
-                            )
-                            current_value_parts = []
-
-                        key, _, value = comment_body.partition(":")
-                        key = key.strip().lower()
-
-                        if key in self.METADATA_KEYS:
-                            current_key = key
-                            current_value_parts = [value.strip()] if value.strip() else []
-                        else:
-                            current_key = None
-                    else:
-                        # Continuation of previous value
-                        if current_key:
-                            current_value_parts.append(comment_body)
-
-                # Finalize last key if file ended
+        for line in header.split(b"\n"):
+            stripped = line.strip()
+
+            # Empty lines are allowed in metadata block
+            if not stripped:
+                continue
+
+            # Stop at first non-comment line
+            comment = self.COMMENT_LINE_RE.match(stripped)
+            if comment is None:
+                # Finalize any pending metadata
                 if current_key:
                     metadata[current_key] = self._coerce_metadata_value(
                         current_key, " ".join(current_value_parts)
                     )
+                break
 
-        except (OSError, UnicodeDecodeError):
-            return metadata
+            comment_body = comment.group(1).lstrip(b"! ").strip()
+
+            # Skip empty comments
+            if not comment_body:
+                continue
+
+            # Check if this is a new key:value pair
+            if b":" in comment_body:
+                # Finalize previous key if exists
+                if current_key:
+                    metadata[current_key] = self._coerce_metadata_value(
+                        current_key, " ".join(current_value_parts)
+                    )
+                    current_value_parts = []
+
+                match = self.METADATA_KEY_RE.match(comment_body)
+                if match:
+                    current_key = match.group(1).decode("ascii").lower()
+                    value = match.group(2).decode("utf-8", errors="ignore").strip()
+                    current_value_parts = [value] if value else []
+                else:
+                    current_key = None
+            else:
+                # Continuation of previous value
+                if current_key:
+                    current_value_parts.append(comment_body.decode("utf-8", errors="ignore"))
+
+        # Finalize last key if file ended
+        if current_key:
+            metadata[current_key] = self._coerce_metadata_value(
+                current_key, " ".join(current_value_parts)
+            )
 
         self._validate_metadata(file_path, metadata)
         return metadata
@@ -190,51 +297,140 @@ class ScriptIndex:
 
         return False
 
+    def _iter_files(self, directory: str | Path) -> Iterator[os.DirEntry]:
+        """Yield a DirEntry for every file under directory, without following directory symlinks."""
+        try:
+            with os.scandir(directory) as entries:
+                files = []
+                subdirs = []
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file():
+                        files.append(entry)
+        except OSError:
+            return
+
+        yield from files
+        for subdir in subdirs:
+            yield from self._iter_files(subdir)
+
+    def _index_entry(self, file_path: str, stem: str, suffix: str) -> Optional[Dict[str, Any]]:
+        """Read and parse one candidate file; None if it is not a script."""
+        # One read serves both the shebang check and header parsing
+        try:
+            header = self._read_header_bytes(file_path)
+        except OSError:
+            header = None
+        if not suffix and not (header and header.startswith(b"#!")):
+            return None
+
+        metadata = self.parse_script_header_bytes(header, file_path) if header is not None else {}
+        return {
+            "path": file_path,
+            "name": metadata.get("name") or stem,
+            "description": metadata.get("description"),
+            "inputs": metadata.get("inputs"),
+            "outputs": metadata.get("outputs"),
+            "tags": metadata.get("tags") or [],
+            "timeout": metadata.get("timeout"),
+            "task_class": metadata.get("task_class"),
+        }
+
     def build(self) -> None:
-        """Populate the in-memory index from configured script directories."""
+        """Populate the in-memory index from configured script directories.
+
+        Files whose mtime and size match the previous build (or the persistent cache file,
+        on a fresh instance) reuse their cached entry; the rest are parsed on a thread pool
+        once there are enough of them to pay for it.
+        """
         self.index = []
-        script_dirs = self._resolve_script_dirs()
+        self._lookup_source = None
+        config = self._load_config()
+        script_dirs = self._resolve_script_dirs(config)
+        cache_path = self._resolve_cache_path(config)
+
+        previous = self._cache
+        if not previous and cache_path is not None:
+            previous = self._load_persisted_cache(cache_path)
+        self._cache = {}
 
+        # (path, stem, suffix, signature, cached entry or _UNPARSED) in discovery order.
+        # Paths stay plain strings; DirEntry.path is already joined onto the resolved directory.
+        candidates: List[tuple] = []
         for directory in script_dirs:
             if not directory.exists():
                 continue
 
-            for file_path in directory.rglob("*"):
-                if not self.is_script_file(file_path):
+            for dir_entry in self._iter_files(directory):
+                # Split the bare name with the same rule as Path.suffix/Path.stem
+                name = dir_entry.name
+                dot = name.rfind(".")
+                if 0 < dot < len(name) - 1:
+                    stem, suffix = name[:dot], name[dot:].lower()
+                else:
+                    stem, suffix = name, ""
+                if suffix and suffix not in self.SCRIPT_EXTENSIONS:
                     continue
 
-                metadata = self.parse_script_header(file_path)
-                tags = metadata.get("tags") or []
-                entry = {
-                    "path": str(file_path),
-                    "name": metadata.get("name") or file_path.stem,
-                    "description": metadata.get("description"),
-                    "inputs": metadata.get("inputs"),
-                    "outputs": metadata.get("outputs"),
-                    "tags": tags,
-                    "timeout": metadata.get("timeout"),
-                    "task_class": metadata.get("task_class"),
-                }
+                try:
+                    stat = dir_entry.stat()
+                except OSError:
+                    continue
+                signature = (stat.st_mtime_ns, stat.st_size)
+
+                cached = previous.get(dir_entry.path)
+                entry = cached[2] if cached is not None and cached[:2] == signature else _UNPARSED
+                candidates.append((dir_entry.path, stem, suffix, signature, entry))
+
+        to_parse = [candidate[:3] for candidate in candidates if candidate[4] is _UNPARSED]
+        if len(to_parse) >= self.PARALLEL_PARSE_MIN_FILES:
+            # Header reads are small blocking I/O that release the GIL
+            with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+                parsed = iter(list(executor.map(self._index_entry, *zip(*to_parse))))
+        else:
+            parsed = (self._index_entry(*args) for args in to_parse)
+
+        for file_path, _, _, signature, entry in candidates:
+            if entry is _UNPARSED:
+                entry = next(parsed)
+            self._cache[file_path] = (*signature, entry)
+            if entry is not None:
                 self.index.append(entry)
 
+        if cache_path is not None:
+            self._persist_cache(cache_path, previous)
+
+    def _lookups(self) -> tuple:
+        """Return (haystacks, by_name) for the current index, recomputing them if it changed.
+
+        haystacks pairs each entry with its lowercased name, description and tags joined by
+        SEARCH_FIELD_SEPARATOR; by_name maps lowercased names to the first entry with that name.
+        """
+        # build()/rebuild() reset _lookup_source whenever they replace the index
+        if self._lookup_source is not self.index:
+            haystacks = []
+            by_name: Dict[str, Dict[str, Any]] = {}
+            for entry in self.index:
+                name = str(entry.get("name", "")).lower()
+                fields = [name, str(entry.get("description", "")).lower()]
+                fields.extend(str(tag).lower() for tag in entry.get("tags") or [])
+                haystacks.append((self.SEARCH_FIELD_SEPARATOR.join(fields), entry))
+                by_name.setdefault(name, entry)
+
+            self._haystacks = haystacks
+            self._by_name = by_name
+            self._lookup_source = self.index
+        return self._haystacks, self._by_name
+
     def search(self, query: str) -> List[Dict[str, Any]]:
         """Search scripts by name, description, or tags."""
         query_lower = query.lower()
-        results: List[Dict[str, Any]] = []
-
-        for entry in self.index:
-            name = str(entry.get("name", "")).lower()
-            description = str(entry.get("description", "")).lower()
-            tags = [str(tag).lower() for tag in entry.get("tags") or []]
-
-            if (
-                query_lower in name
-                or query_lower in description
-                or any(query_lower in tag for tag in tags)
-            ):
-                results.append(entry)
+        if self.SEARCH_FIELD_SEPARATOR in query_lower:
+            return []
 
-        return results
+        haystacks, _ = self._lookups()
+        return [entry for haystack, entry in haystacks if query_lower in haystack]
 
     def list_all(self) -> List[Dict[str, Any]]:
         """Return all indexed scripts."""
@@ -243,12 +439,10 @@ class ScriptIndex:
     def rebuild(self) -> None:
         """Clear and rebuild the index."""
         self.index = []
+        self._lookup_source = None
         self.build()
 
     def get_script(self, name: str) -> Optional[Dict[str, Any]]:
         """Get a script entry by its name."""
-        name_lower = name.lower()
-        for entry in self.index:
-            if str(entry.get("name", "")).lower() == name_lower:
-                return entry
-        return None
+        _, by_name = self._lookups()
+        return by_name.get(name.lower())
@@ -1,26 +1,27 @@
 """SparkQ Pydantic Models"""
 
-from enum import Enum
+import json
+from enum import StrEnum
 from typing import Optional, List, Dict, Any
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 
 
-class TaskStatus(str, Enum):
+class TaskStatus(StrEnum):
     QUEUED = "queued"
     RUNNING = "running"
     SUCCEEDED = "succeeded"
     FAILED = "failed"
 
 
-class TaskClass(str, Enum):
+class TaskClass(StrEnum):
     FAST_SCRIPT = "FAST_SCRIPT"
     MEDIUM_SCRIPT = "MEDIUM_SCRIPT"
     LLM_LITE = "LLM_LITE"
     LLM_HEAVY = "LLM_HEAVY"
 
 
-class QueueModelProfile(str, Enum):
+class QueueModelProfile(StrEnum):
     """Model routing profiles for queues"""
 
     HAIKU_ONLY = "haiku-only"
@@ -29,12 +30,12 @@ class QueueModelProfile(str, Enum):
     AUTO = "auto"
 
 
-class SessionStatus(str, Enum):
+class SessionStatus(StrEnum):
     ACTIVE = "active"
     ENDED = "ended"
 
 
-class QueueStatus(str, Enum):
+class QueueStatus(StrEnum):
     ACTIVE = "active"
     ENDED = "ended"
 
@@ -93,6 +94,34 @@ class Task(BaseModel):
     started_at: Optional[datetime] = None
     finished_at: Optional[datetime] = None
 
+    # (raw payload string, parsed value) from the last payload_obj access
+    _payload_cache: Optional[tuple] = PrivateAttr(default=None)
+
+    @property
+    def payload_obj(self) -> Any:
+        """Parsed payload; the JSON is decoded once and reused until payload changes."""
+        cached = self._payload_cache
+        if cached is None or cached[0] is not self.payload:
+            cached = (self.payload, json.loads(self.payload))
+            self._payload_cache = cached
+        return cached[1]
+
+
+class TaskPayload(BaseModel):
+    prompt: Optional[str] = None
+    raw_prompt: Optional[str] = None
+    prompt_path: Optional[str] = None
+    script_path: Optional[str] = None
+    args: Optional[List[str]] = None
+    metadata: Optional[Dict[str, Any]] = None
+    queue_instructions: Optional[str] = None
+    agent_role_key: Optional[str] = None
+    agent_role_label: Optional[str] = None
+    agent_role_description: Optional[str] = None
+    mode: Optional[str] = None
+
+    model_config = ConfigDict(extra="allow")
+
 
 class TaskClassDefaults(BaseModel):
     """Default timeouts by task class"""
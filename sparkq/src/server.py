@@ -1,7 +1,6 @@
 """SparkQ server wrapper with lockfile coordination and startup tasks."""
 
 import atexit
-import fcntl
 import logging
 import os
 import signal
@@ -63,26 +62,30 @@ def is_process_running(pid: int) -> bool:
     try:
         os.kill(pid, 0)
         return True
+    except PermissionError:
+        # EPERM: the PID exists but belongs to another user
+        return True
     except OSError:
         return False
 
 
 def create_lockfile():
-    """Write current PID to lockfile in a thread-safe manner."""
+    """Publish the current PID as the lockfile atomically; fail if one already exists.
+
+    The PID goes into a private temp file that is then hard-linked into place, so readers
+    never see an empty or half-written lockfile. link(2) refuses an existing target just
+    like O_EXCL did.
+    """
     pid = os.getpid()
-    lock_bytes = str(pid).encode()
+    tmp_path = LOCKFILE_PATH.with_name(f"{LOCKFILE_PATH.name}.{pid}.tmp")
     with _lockfile_lock:
+        tmp_path.write_text(str(pid))
         try:
-            fd = os.open(LOCKFILE_PATH, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.link(tmp_path, LOCKFILE_PATH)
         except FileExistsError as exc:
             raise RuntimeError("SparkQ server lockfile already exists; is another server running?") from exc
-
-        with os.fdopen(fd, "wb") as handle:
-            try:
-                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
-            except OSError:
-                raise RuntimeError("Failed to lock SparkQ server lockfile; another instance may be starting")
-            handle.write(lock_bytes)
+        finally:
+            tmp_path.unlink(missing_ok=True)
 
 
 def remove_lockfile():
@@ -2,12 +2,13 @@
 
 import json
 import logging
+import secrets
 import sqlite3
+import threading
 import time
-import uuid
 from datetime import UTC, datetime, timedelta, timezone
 from pathlib import Path
-from contextlib import contextmanager
+from contextlib import contextmanager, suppress
 from typing import Optional, List, Dict, Any
 
 try:
@@ -16,6 +17,7 @@ except ImportError:
     from typing_extensions import TypedDict, NotRequired
 
 from .constants import (
+    DB_CACHED_STATEMENTS,
     DB_LOCK_TIMEOUT_SECONDS,
     DEFAULT_TASK_TIMEOUT_SECONDS,
     MAX_TASK_LIST_LIMIT,
@@ -95,23 +97,23 @@ class AgentRoleRow(TypedDict):
 
 # ID generation helpers
 def gen_project_id() -> str:
-    return f"prj_{uuid.uuid4().hex[:12]}"
+    return f"prj_{secrets.token_hex(6)}"
 
 
 def gen_session_id() -> str:
-    return f"ses_{uuid.uuid4().hex[:12]}"
+    return f"ses_{secrets.token_hex(6)}"
 
 
 def gen_queue_id() -> str:
-    return f"que_{uuid.uuid4().hex[:12]}"
+    return f"que_{secrets.token_hex(6)}"
 
 
 def gen_task_id() -> str:
-    return f"tsk_{uuid.uuid4().hex[:12]}"
+    return f"tsk_{secrets.token_hex(6)}"
 
 
 def gen_prompt_id() -> str:
-    return f"prm_{uuid.uuid4().hex[:12]}"
+    return f"prm_{secrets.token_hex(6)}"
 
 
 def now_iso() -> str:
@@ -119,28 +121,109 @@ def now_iso() -> str:
     return datetime.now(UTC).isoformat().replace("+00:00", "Z")
 
 
+_INSERT_TASK_SQL = """
+    INSERT INTO tasks (id, queue_id, tool_name, task_class, payload, agent_role_key, status, timeout, attempts,
+                       claimed_at, stale_warned_at, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _task_insert_params(task: TaskRow) -> tuple:
+    return (
+        task["id"],
+        task["queue_id"],
+        task["tool_name"],
+        task["task_class"],
+        task["payload"],
+        task["agent_role_key"],
+        task["status"],
+        task["timeout"],
+        task["attempts"],
+        task["claimed_at"],
+        task["stale_warned_at"],
+        task["created_at"],
+        task["updated_at"],
+    )
+
+
 class Storage:
     def __init__(self, db_path: str = "sparkq/data/sparkq.db"):
-        resolved = Path(db_path).expanduser().resolve()
-        try:
-            resolved.parent.mkdir(parents=True, exist_ok=True)
-        except Exception:
-            # If we cannot create the directory, surface the original path resolution
-            raise
-        self.db_path = str(resolved)
+        if str(db_path).startswith("file:"):
+            # SQLite URI (e.g. a shared-cache in-memory DB in tests); used verbatim
+            self.db_path = str(db_path)
+        else:
+            resolved = Path(db_path).expanduser().resolve()
+            try:
+                resolved.parent.mkdir(parents=True, exist_ok=True)
+            except Exception:
+                # If we cannot create the directory, surface the original path resolution
+                raise
+            self.db_path = str(resolved)
         self.logger = logging.getLogger(__name__)
         self.max_task_list_limit = MAX_TASK_LIST_LIMIT
+        # bulk_transaction() state is per thread so concurrent requests never join another's transaction
+        self._local = threading.local()
+
+    @property
+    def _bulk_conn(self) -> Optional[sqlite3.Connection]:
+        return getattr(self._local, "bulk_conn", None)
+
+    @_bulk_conn.setter
+    def _bulk_conn(self, conn: Optional[sqlite3.Connection]) -> None:
+        self._local.bulk_conn = conn
+
+    def _connect(self, timeout: float, **kwargs) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=timeout,
+            cached_statements=DB_CACHED_STATEMENTS,
+            uri=self.db_path.startswith("file:"),
+            **kwargs,
+        )
+        conn.row_factory = sqlite3.Row
+        return conn
 
     @contextmanager
     def connection(self, timeout: float = DB_LOCK_TIMEOUT_SECONDS):
-        conn = sqlite3.connect(self.db_path, timeout=timeout)
-        conn.row_factory = sqlite3.Row
+        if self._bulk_conn is not None:
+            # Inside bulk_transaction(): join its transaction, commit happens on exit
+            yield self._bulk_conn
+            return
+
+        conn = self._connect(timeout)
         try:
             yield conn
             conn.commit()
         finally:
             conn.close()
 
+    @contextmanager
+    def bulk_transaction(self, timeout: float = DB_LOCK_TIMEOUT_SECONDS):
+        """Run every storage call made in the block, on this thread, inside one BEGIN IMMEDIATE transaction.
+
+        Commits once on exit and rolls back if the block raises. claim_task() skips
+        its own BEGIN EXCLUSIVE here since the outer transaction already holds the
+        write lock.
+        """
+        if self._bulk_conn is not None:
+            yield self._bulk_conn
+            return
+
+        conn = self._connect(timeout, isolation_level=None)
+        conn.execute("BEGIN IMMEDIATE")
+        self._bulk_conn = conn
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            # SQLite may already have rolled back (e.g. on SQLITE_FULL); keep the original error
+            with suppress(sqlite3.Error):
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            self._bulk_conn = None
+            conn.close()
+
     def init_db(self):
         """Create tables if they don't exist"""
         with self.connection() as conn:
@@ -924,31 +1007,50 @@ class Storage:
         metadata: str = None,
         agent_role_key: str = None,
     ) -> TaskRow:
-        task_id = gen_task_id()
-        now = now_iso()
+        task = self._new_task_row(queue_id, tool_name, task_class, payload, timeout, agent_role_key)
 
         with self.connection() as conn:
-            conn.execute(
-                """INSERT INTO tasks (id, queue_id, tool_name, task_class, payload, agent_role_key, status, timeout, attempts,
-                                      claimed_at, stale_warned_at, created_at, updated_at)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (
-                    task_id,
-                    queue_id,
-                    tool_name,
-                    task_class,
-                    payload,
-                    agent_role_key,
-                    'queued',
-                    timeout,
-                    0,
-                    None,
-                    None,
-                    now,
-                    now,
-                )
+            conn.execute(_INSERT_TASK_SQL, _task_insert_params(task))
+
+        return task
+
+    def create_tasks_bulk(self, tasks: List[Dict[str, Any]]) -> List[TaskRow]:
+        """Insert several tasks with one executemany in a single transaction.
+
+        Each entry takes the same keys as create_task (queue_id, tool_name,
+        task_class, payload, timeout, optional agent_role_key). Rows are
+        stamped individually so FIFO ordering by created_at is preserved.
+        """
+        rows = [
+            self._new_task_row(
+                spec["queue_id"],
+                spec["tool_name"],
+                spec["task_class"],
+                spec["payload"],
+                spec["timeout"],
+                spec.get("agent_role_key"),
             )
+            for spec in tasks
+        ]
+        if not rows:
+            return []
+
+        with self.connection() as conn:
+            conn.executemany(_INSERT_TASK_SQL, [_task_insert_params(row) for row in rows])
+
+        return rows
 
+    @staticmethod
+    def _new_task_row(
+        queue_id: str,
+        tool_name: str,
+        task_class: str,
+        payload: str,
+        timeout: int,
+        agent_role_key: Optional[str] = None,
+    ) -> TaskRow:
+        task_id = gen_task_id()
+        now = now_iso()
         return {
             'id': task_id,
             'queue_id': queue_id,
@@ -977,6 +1079,34 @@ class Storage:
             row = cursor.fetchone()
             return dict(row) if row else None
 
+    def get_full_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch a task together with its queue and session in a single query.
+
+        Returns {"task": ..., "queue": ..., "session": ...}, or None if the task (or its
+        queue/session) does not exist.
+        """
+        with self.connection() as conn:
+            cursor = conn.execute(
+                """SELECT t.*, NULL AS _queue_cols, q.*, NULL AS _session_cols, s.*
+                   FROM tasks t
+                   JOIN queues q ON q.id = t.queue_id
+                   JOIN sessions s ON s.id = q.session_id
+                   WHERE t.id = ?""",
+                (task_id,),
+            )
+            row = cursor.fetchone()
+            if not row:
+                return None
+            names = [col[0] for col in cursor.description]
+            values = tuple(row)
+            queue_at = names.index("_queue_cols")
+            session_at = names.index("_session_cols")
+            return {
+                "task": dict(zip(names[:queue_at], values[:queue_at])),
+                "queue": dict(zip(names[queue_at + 1:session_at], values[queue_at + 1:session_at])),
+                "session": dict(zip(names[session_at + 1:], values[session_at + 1:])),
+            }
+
     def list_tasks(self, queue_id: str = None, status: str = None, limit: int = None, offset: int = 0) -> List[TaskRow]:
         with self.connection() as conn:
             query = "SELECT * FROM tasks WHERE 1=1"
@@ -1003,6 +1133,21 @@ class Storage:
             cursor = conn.execute(query, params)
             return [dict(row) for row in cursor.fetchall()]
 
+    def count_tasks(self, queue_id: str = None, status: str = None) -> int:
+        """Return the number of tasks matching the optional queue/status filters."""
+        query = "SELECT COUNT(*) AS cnt FROM tasks WHERE 1=1"
+        params = []
+        if queue_id:
+            query += " AND queue_id = ?"
+            params.append(queue_id)
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+
+        with self.connection() as conn:
+            row = conn.execute(query, params).fetchone()
+            return row["cnt"] if row else 0
+
     def get_queue_stats(self, queue_ids: List[str]) -> Dict[str, Dict[str, int]]:
         """
         Return aggregated task counts per queue to avoid N+1 fetching.
@@ -1096,10 +1241,14 @@ class Storage:
         """Claim a task by setting status to 'running' and claimed_at/started_at timestamps."""
         now = now_iso()
         with self.connection(timeout=10.0) as conn:
-            # Enable explicit transaction control for serialized claims
-            conn.isolation_level = None
+            # Inside bulk_transaction() the outer BEGIN IMMEDIATE already holds the write lock
+            own_transaction = conn is not self._bulk_conn
+            if own_transaction:
+                # Enable explicit transaction control for serialized claims
+                conn.isolation_level = None
             try:
-                conn.execute("BEGIN EXCLUSIVE")
+                if own_transaction:
+                    conn.execute("BEGIN EXCLUSIVE")
 
                 cursor = conn.execute(
                     """UPDATE tasks
@@ -1113,7 +1262,8 @@ class Storage:
                 )
 
                 if cursor.rowcount == 0:
-                    conn.execute("ROLLBACK")
+                    if own_transaction:
+                        conn.execute("ROLLBACK")
                     raise ConflictError(f"Task {task_id} not found or already claimed")
 
                 cursor = conn.execute(
@@ -1129,10 +1279,11 @@ class Storage:
                 row = cursor.fetchone()
                 return dict(row) if row else None
             except Exception:
-                try:
-                    conn.execute("ROLLBACK")
-                except Exception:
-                    self.logger.exception("Failed to rollback claim for task %s", task_id)
+                if own_transaction:
+                    try:
+                        conn.execute("ROLLBACK")
+                    except Exception:
+                        self.logger.exception("Failed to rollback claim for task %s", task_id)
                 raise
 
     # === Config helpers (Phase 20) ===
@@ -1212,7 +1363,7 @@ class Storage:
 
     def log_audit(self, actor: Optional[str], action: str, details: Optional[dict] = None):
         now = now_iso()
-        audit_id = f"audit_{uuid.uuid4().hex[:12]}"
+        audit_id = f"audit_{secrets.token_hex(6)}"
         details_str = json.dumps(details) if details is not None else None
         with self.connection() as conn:
             conn.execute(
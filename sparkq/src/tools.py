@@ -3,7 +3,7 @@
 from typing import Optional
 
 from .constants import DEFAULT_TOOL_TIMEOUT_SECONDS, TASK_CLASS_TIMEOUTS
-from .config import get_database_path, load_config
+from .config import get_database_path, load_config, load_config_cached
 from .paths import get_config_path
 from .models import TaskClassDefaults
 
@@ -108,7 +108,7 @@ def reload_registry(config: dict | None = None) -> ToolRegistry:
 
 def _load_registry_from_db_or_yaml() -> ToolRegistry:
     """Attempt to build registry from DB config; fallback to YAML."""
-    cfg = load_config()
+    cfg = load_config_cached()
     yaml_tools = cfg.get("tools") or {}
     yaml_task_classes = cfg.get("task_classes") or {}
 
@@ -1,6 +1,8 @@
+import sqlite3
 import sys
 from datetime import datetime
 from pathlib import Path
+from uuid import uuid4
 from zoneinfo import ZoneInfo
 
 import pytest
@@ -20,16 +22,70 @@ from src.storage import Storage
 TEST_LOGS_DIR = Path(__file__).resolve().parent / "logs"
 
 
+@pytest.fixture(scope="session")
+def worker_id(request):
+    """pytest-xdist worker name ("gw0", "gw1", ...) or "master" when running serially.
+
+    Mirrors the fixture pytest-xdist provides so tests can key per-worker
+    resources on it whether or not the plugin is installed.
+    """
+    workerinput = getattr(request.config, "workerinput", None)
+    return workerinput["workerid"] if workerinput else "master"
+
+
 @pytest.fixture
 def temp_db_path(tmp_path):
     return tmp_path / "sparkq_test.db"
 
 
 @pytest.fixture
-def storage(temp_db_path):
-    store = Storage(str(temp_db_path))
-    store.init_db()
-    yield store
+def memory_db_uri():
+    """Shared-cache in-memory SQLite URI unique to this test, usable as a Storage db_path.
+
+    An anchor connection stays open for the test's lifetime: Storage opens a
+    connection per call and SQLite drops a memory DB when its last one closes.
+    """
+    uri = f"file:sparkq_{uuid4().hex}?mode=memory&cache=shared"
+    anchor = sqlite3.connect(uri, uri=True)
+    yield uri
+    anchor.close()
+
+
+@pytest.fixture(scope="session")
+def _storage_template(tmp_path_factory):
+    """Database with the full schema (WAL, migrations, seeds), built once per session.
+
+    Storage opens a connection per call, so tests cannot share one connection and
+    roll back; instead each test gets a page-level copy of this file.
+    """
+    template_path = tmp_path_factory.mktemp("storage_template") / "template.db"
+    Storage(str(template_path)).init_db()
+    template = sqlite3.connect(template_path)
+    yield template
+    template.close()
+
+
+@pytest.fixture
+def storage(memory_db_uri, _storage_template):
+    """Storage on a per-test in-memory copy of the template schema.
+
+    Durability is irrelevant here, so no WAL/SHM files or fsyncs; tests that need
+    on-disk behaviour (journal mode, cross-connection isolation) use file_storage.
+    """
+    # Backup copies pages verbatim, skipping per-test DDL; memory_db_uri's anchor keeps the copy alive
+    target = sqlite3.connect(memory_db_uri, uri=True)
+    _storage_template.backup(target)
+    target.close()
+    yield Storage(memory_db_uri)
+
+
+@pytest.fixture
+def file_storage(temp_db_path, _storage_template):
+    """Storage on an on-disk WAL copy of the template schema."""
+    target = sqlite3.connect(temp_db_path)
+    _storage_template.backup(target)
+    target.close()
+    yield Storage(str(temp_db_path))
 
     # Cleanup database artifacts created during tests
     for suffix in ("", "-wal", "-shm"):
@@ -256,6 +256,45 @@ class TestTaskEndpoints:
         defaults = TaskClassDefaults().model_dump()
         assert data["task"]["timeout"] == defaults["FAST_SCRIPT"]
 
+    def test_create_task_id_only_returns_plain_id(self, api_client, storage_with_stream):
+        queue = storage_with_stream["queue"]
+        response = api_client.post(
+            "/api/tasks?id_only=1",
+            json={"queue_id": queue["id"], "tool_name": "echo", "task_class": "FAST_SCRIPT"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert storage_with_stream["storage"].get_task(response.text)["queue_id"] == queue["id"]
+
+    def test_task_transitions_roll_back_on_invalid_action(self, api_client, queued_task):
+        response = api_client.post(
+            f"/api/tasks/{queued_task['id']}/transitions",
+            json={"actions": [{"action": "claim"}, {"action": "requeue"}]},
+        )
+        assert response.status_code == 409
+
+        task = api_client.get(f"/api/tasks/{queued_task['id']}").json()["task"]
+        assert task["status"] == "queued"
+
+    def test_list_tasks_count_only(self, api_client, queued_task):
+        response = api_client.get(f"/api/tasks?queue_id={queued_task['queue_id']}&status=queued&count_only=1")
+        assert response.status_code == 200
+        assert response.json() == {"count": 1}
+
+    def test_create_tasks_bulk_rejects_unknown_queue(self, api_client, storage_with_stream):
+        queue = storage_with_stream["queue"]
+        payload = {
+            "tasks": [
+                {"queue_id": queue["id"], "tool_name": "echo", "task_class": "FAST_SCRIPT"},
+                {"queue_id": "que_missing", "tool_name": "echo", "task_class": "FAST_SCRIPT"},
+            ]
+        }
+        response = api_client.post("/api/tasks/bulk", json=payload)
+        assert response.status_code == 404
+
+        listed = api_client.get(f"/api/tasks?queue_id={queue['id']}").json()["tasks"]
+        assert listed == []
+
     def test_get_task(self, api_client, queued_task):
         response = api_client.get(f"/api/tasks/{queued_task['id']}")
         assert response.status_code == 200
@@ -1,27 +1,47 @@
+import io
+import json
 import os
 import re
+import shutil
 import sys
+import tarfile
+import uuid
 from pathlib import Path
 
 import pytest
+import yaml
 from typer.testing import CliRunner
 
-PROJECT_ROOT = Path(__file__).resolve().parents[3]
-if str(PROJECT_ROOT) not in sys.path:
-    sys.path.insert(0, str(PROJECT_ROOT))
-
 from src import tools
 from src.cli import app, get_storage
+from src.storage import Storage
 
 pytestmark = pytest.mark.integration
 
 SESSION_ID_RE = re.compile(r"ses_[0-9a-f]{12}")
 QUEUE_ID_RE = re.compile(r"que_[0-9a-f]{12}")
-TASK_ID_RE = re.compile(r"tsk_[0-9a-f]{12}")
 
 
-def write_default_config(script_dir: str = "scripts") -> None:
-    config = f"""project:
+SAMPLE_SCRIPTS = {
+    "scripts/hello.sh": (
+        "#!/bin/bash\n"
+        "# name: hello-world\n"
+        "# description: Says hello\n"
+        "# tags: greeting, sample\n"
+        "echo \"hello\"\n"
+    ),
+    "scripts/cleanup.py": (
+        "#!/usr/bin/env python3\n"
+        "# name: cleanup-db\n"
+        "# description: Cleans the database\n"
+        "# tags: maintenance\n"
+        "print('cleanup')\n"
+    ),
+}
+
+
+def render_default_config(script_dir: str = "scripts") -> str:
+    return f"""project:
   name: test-project
   repo_path: .
   prd_path: null
@@ -45,11 +65,52 @@ tools:
     description: Run python script
     task_class: MEDIUM_SCRIPT
 """
-    Path("sparkq.yml").write_text(config)
+
+
+def write_default_config(script_dir: str = "scripts") -> None:
+    Path("sparkq.yml").write_text(render_default_config(script_dir))
+
+
+@pytest.fixture(scope="session")
+def _shared_registry():
+    """Registry for the default test config; no test mutates it, so build it once."""
+    config = yaml.safe_load(render_default_config())
+    return tools.ToolRegistry(
+        config_dict={"tools": config["tools"], "task_classes": config["task_classes"]},
+        source="yaml",
+    )
+
+
+@pytest.fixture(scope="session")
+def _scripts_tarball() -> bytes:
+    """SAMPLE_SCRIPTS packed once so each test unpacks them in a single pass."""
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        for name, text in SAMPLE_SCRIPTS.items():
+            data = text.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+@pytest.fixture(scope="session")
+def _template_db(tmp_path_factory):
+    """Initialized schema plus the test project row, built once per session.
+
+    Storage opens a new connection per call, so a per-test SAVEPOINT cannot
+    span a CLI command; copying this file gives each test the same
+    post-setup state without re-running the DDL.
+    """
+    db_path = tmp_path_factory.mktemp("cli_db") / "template.db"
+    store = Storage(str(db_path))
+    store.init_db()
+    store.create_project(name="test-project", repo_path=".", prd_path=None)
+    return db_path
 
 
 @pytest.fixture
-def cli_runner():
+def cli_runner(worker_id, _shared_registry, _template_db, _scripts_tarball, monkeypatch):
     runner = CliRunner(mix_stderr=False)
     with runner.isolated_filesystem():
         write_default_config()
@@ -60,34 +121,27 @@ def cli_runner():
         if str(Path.cwd()) not in sys.path:
             sys.path.insert(0, str(Path.cwd()))
         # Create scripts directory with sample scripts
-        Path("scripts").mkdir(parents=True, exist_ok=True)
-        Path("scripts/hello.sh").write_text(
-            "#!/bin/bash\n"
-            "# name: hello-world\n"
-            "# description: Says hello\n"
-            "# tags: greeting, sample\n"
-            "echo \"hello\"\n"
-        )
-        Path("scripts/cleanup.py").write_text(
-            "#!/usr/bin/env python3\n"
-            "# name: cleanup-db\n"
-            "# description: Cleans the database\n"
-            "# tags: maintenance\n"
-            "print('cleanup')\n"
-        )
-        tools._registry = None
-        tools.reload_registry()
-        get_storage().db_path = "sparkq.db"
-        get_storage().init_db()
-        get_storage().create_project(name="test-project", repo_path=".", prd_path=None)
+        with tarfile.open(fileobj=io.BytesIO(_scripts_tarball), mode="r") as tar:
+            tar.extractall(filter="data")
+        # monkeypatch restores the previous singleton on teardown, so the
+        # next test never has to rebuild a registry that was reset to None
+        monkeypatch.setattr(tools, "_registry", _shared_registry)
+        # Per-worker DB name keeps `pytest -n auto` runs from sharing a file
+        db_name = f"sparkq_{worker_id}_{uuid.uuid4().hex}.db"
+        shutil.copyfile(_template_db, db_name)
+        get_storage().db_path = db_name
         yield runner
-        tools._registry = None
 
 
-def extract_task_id(text: str) -> str:
-    match = TASK_ID_RE.search(text)
-    assert match, "Task ID not found in output"
-    return match.group(0)
+def invoke_json(runner: CliRunner, args: list[str]) -> dict:
+    """Run a task command with --json and return the parsed payload."""
+    result = runner.invoke(app, [*args, "--json"])
+    assert result.exit_code == 0, result.stderr
+    return json.loads(result.stdout)
+
+
+def enqueue_task(runner: CliRunner, queue: str, tool: str = "run-bash") -> str:
+    return invoke_json(runner, ["enqueue", "--queue", queue, "--tool", tool])["task_id"]
 
 
 def create_session_and_queue(runner: CliRunner, session_name: str, queue_name: str, instructions: str | None = None):
@@ -174,8 +228,8 @@ class TestTaskCommands:
     def test_enqueue_task(self, cli_runner: CliRunner):
         create_session_and_queue(cli_runner, "task-session", "task-queue")
 
-        result = cli_runner.invoke(
-            app,
+        data = invoke_json(
+            cli_runner,
             [
                 "enqueue",
                 "--queue",
@@ -187,9 +241,13 @@ class TestTaskCommands:
             ],
         )
 
+        assert data["task_id"].startswith("tsk_")
+        assert data["queue"] == "task-queue"
+        assert data["status"] == "queued"
+
+        result = cli_runner.invoke(app, ["enqueue", "--queue", "task-queue", "--tool", "run-bash"])
+
         assert result.exit_code == 0
-        task_id = extract_task_id(result.stdout)
-        assert task_id.startswith("tsk_")
         assert "task-queue" in result.stdout
 
     def test_enqueue_invalid_tool(self, cli_runner: CliRunner):
@@ -232,44 +290,35 @@ class TestTaskCommands:
 
     def test_peek_task(self, cli_runner: CliRunner):
         create_session_and_queue(cli_runner, "task-session", "task-queue")
-        enqueue_result = cli_runner.invoke(
-            app,
-            [
-                "enqueue",
-                "--queue",
-                "task-queue",
-                "--tool",
-                "run-bash",
-            ],
-        )
-        queued_id = extract_task_id(enqueue_result.stdout)
+        queued_id = enqueue_task(cli_runner, "task-queue")
+
+        peeked = invoke_json(cli_runner, ["peek", "--queue", "task-queue"])
+
+        assert peeked["task_id"] == queued_id
+        assert peeked["tool"] == "run-bash"
+        assert peeked["status"] == "queued"
 
         peek_result = cli_runner.invoke(app, ["peek", "--queue", "task-queue"])
 
         assert peek_result.exit_code == 0
-        peek_id = extract_task_id(peek_result.stdout)
-        assert peek_id == queued_id
+        assert queued_id in peek_result.stdout
         assert "run-bash" in peek_result.stdout
 
     def test_claim_task(self, cli_runner: CliRunner):
         create_session_and_queue(cli_runner, "task-session", "task-queue")
-        enqueue_result = cli_runner.invoke(
-            app,
-            [
-                "enqueue",
-                "--queue",
-                "task-queue",
-                "--tool",
-                "run-bash",
-            ],
-        )
-        queued_id = extract_task_id(enqueue_result.stdout)
+        queued_id = enqueue_task(cli_runner, "task-queue")
 
+        claimed = invoke_json(cli_runner, ["claim", "--queue", "task-queue"])
+
+        assert claimed["task_id"] == queued_id
+        assert claimed["queue"] == "task-queue"
+        assert claimed["status"] == "running"
+
+        queued_id = enqueue_task(cli_runner, "task-queue")
         claim_result = cli_runner.invoke(app, ["claim", "--queue", "task-queue"])
 
         assert claim_result.exit_code == 0
-        claimed_id = extract_task_id(claim_result.stdout)
-        assert claimed_id == queued_id
+        assert queued_id in claim_result.stdout
         assert "Queue: task-queue" in claim_result.stdout
 
     def test_claim_without_stream_errors(self, cli_runner: CliRunner):
@@ -281,17 +330,7 @@ class TestTaskCommands:
 
     def test_complete_task(self, cli_runner: CliRunner):
         create_session_and_queue(cli_runner, "task-session", "task-queue")
-        enqueue_result = cli_runner.invoke(
-            app,
-            [
-                "enqueue",
-                "--queue",
-                "task-queue",
-                "--tool",
-                "run-bash",
-            ],
-        )
-        task_id = extract_task_id(enqueue_result.stdout)
+        task_id = enqueue_task(cli_runner, "task-queue")
         claim_result = cli_runner.invoke(app, ["claim", "--queue", "task-queue"])
         assert claim_result.exit_code == 0
 
@@ -312,17 +351,7 @@ class TestTaskCommands:
 
     def test_complete_missing_summary(self, cli_runner: CliRunner):
         create_session_and_queue(cli_runner, "task-session", "task-queue")
-        enqueue_result = cli_runner.invoke(
-            app,
-            [
-                "enqueue",
-                "--queue",
-                "task-queue",
-                "--tool",
-                "run-bash",
-            ],
-        )
-        task_id = extract_task_id(enqueue_result.stdout)
+        task_id = enqueue_task(cli_runner, "task-queue")
         claim_result = cli_runner.invoke(app, ["claim", "--queue", "task-queue"])
         assert claim_result.exit_code == 0
 
@@ -343,17 +372,7 @@ class TestTaskCommands:
 
     def test_fail_task(self, cli_runner: CliRunner):
         create_session_and_queue(cli_runner, "task-session", "task-queue")
-        enqueue_result = cli_runner.invoke(
-            app,
-            [
-                "enqueue",
-                "--queue",
-                "task-queue",
-                "--tool",
-                "run-bash",
-            ],
-        )
-        task_id = extract_task_id(enqueue_result.stdout)
+        task_id = enqueue_task(cli_runner, "task-queue")
         claim_result = cli_runner.invoke(app, ["claim", "--queue", "task-queue"])
         assert claim_result.exit_code == 0
 
@@ -376,17 +395,7 @@ class TestTaskCommands:
 
     def test_requeue_task(self, cli_runner: CliRunner):
         create_session_and_queue(cli_runner, "task-session", "task-queue")
-        enqueue_result = cli_runner.invoke(
-            app,
-            [
-                "enqueue",
-                "--queue",
-                "task-queue",
-                "--tool",
-                "run-bash",
-            ],
-        )
-        task_id = extract_task_id(enqueue_result.stdout)
+        task_id = enqueue_task(cli_runner, "task-queue")
         claim_result = cli_runner.invoke(app, ["claim", "--queue", "task-queue"])
         assert claim_result.exit_code == 0
         fail_result = cli_runner.invoke(
@@ -406,7 +415,13 @@ class TestTaskCommands:
         match = re.search(r"Task (tsk_[0-9a-f]{12}) requeued as (tsk_[0-9a-f]{12})", requeue_result.stdout)
         assert match
         assert match.group(1) == task_id
-        new_task_id = match.group(2)
+
+        requeued = invoke_json(cli_runner, ["requeue", task_id])
+
+        assert requeued["requeued_from"] == task_id
+        assert requeued["queue"] == "task-queue"
+        new_task_id = requeued["task_id"]
+        assert new_task_id != task_id
         new_task = get_storage().get_task(new_task_id)
         assert new_task and new_task["status"] == "queued"
 
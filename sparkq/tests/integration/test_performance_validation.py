@@ -4,349 +4,382 @@ Performance and load testing for throughput, query efficiency, and system behavi
 under typical operational conditions.
 """
 
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import tempfile
 import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 
+from src import api
 from src.api import app, storage as api_storage
 
+SHM_DIR = Path("/dev/shm")
+JSON_HEADERS = {"content-type": "application/json"}
 
-@pytest.fixture
-def client(temp_db_path):
-    """Create a test client with isolated database"""
+
+def make_http_client():
+    """In-process TestClient, or a keep-alive httpx.Client against a live server when SPARKQ_TEST_HTTP=1"""
+    if os.environ.get("SPARKQ_TEST_HTTP") == "1":
+        return httpx.Client(
+            base_url=os.environ.get("SPARKQ_URL", "http://localhost:5005"),
+            timeout=5.0,
+            limits=httpx.Limits(max_keepalive_connections=1, keepalive_expiry=30),
+        )
+    return TestClient(app)
+
+
+def median_ns(fn, rounds=5, warmup_rounds=1):
+    """Call fn warmup_rounds + rounds times; return (median ns over timed rounds, last result).
+
+    Repeating the measured call keeps one cold-cache sample from deciding the bound.
+    """
+    for _ in range(warmup_rounds):
+        fn()
+    samples = []
+    result = None
+    for _ in range(rounds):
+        start_ns = time.perf_counter_ns()
+        result = fn()
+        samples.append(time.perf_counter_ns() - start_ns)
+    return statistics.median(samples), result
+
+
+@contextmanager
+def read_only(storage):
+    """Open storage connections with PRAGMA query_only=ON inside the block so any write fails.
+
+    Patches the Storage instance rather than a thread-local flag: TestClient serves
+    requests on its own worker threads.
+    """
+    real_connect = storage._connect
+
+    def query_only_connect(timeout, **kwargs):
+        conn = real_connect(timeout, **kwargs)
+        conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(storage, "_connect", query_only_connect)
+        yield
+
+
+def task_bodies(queue_id, prefix, count):
+    """Pre-serialized POST /api/tasks bodies, encoded once ahead of the request loop"""
+    return [
+        json.dumps(
+            {
+                "queue_id": queue_id,
+                "tool_name": f"{prefix}-tool-{i}",
+                "task_class": f"{prefix}-class-{i}",
+                "timeout": 300,
+            }
+        ).encode()
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(scope="module")
+def temp_db_path(tmp_path_factory):
+    """One database file shared by every test in this module.
+
+    Set SPARKQ_TEST_INMEMORY=1 to place it on tmpfs (/dev/shm) so commits skip disk fsyncs.
+    With SPARKQ_TEST_HTTP=1 this is SPARKQ_TEST_DB, the database of the (throwaway) live server.
+    """
+    if os.environ.get("SPARKQ_TEST_HTTP") == "1":
+        live_db = os.environ.get("SPARKQ_TEST_DB")
+        if not live_db:
+            pytest.skip("SPARKQ_TEST_HTTP=1 requires SPARKQ_TEST_DB to point at the server's database")
+        yield Path(live_db)
+    elif os.environ.get("SPARKQ_TEST_INMEMORY") == "1" and SHM_DIR.is_dir():
+        db_dir = Path(tempfile.mkdtemp(prefix="sparkq-perf-", dir=SHM_DIR))
+        yield db_dir / "sparkq_test.db"
+        shutil.rmtree(db_dir, ignore_errors=True)
+    else:
+        yield tmp_path_factory.mktemp("perf") / "sparkq_test.db"
+
+
+@pytest.fixture(scope="module")
+def app_client(temp_db_path):
+    """Create a test client once per module; app and schema setup are not repeated"""
     api_storage.db_path = str(temp_db_path)
     api_storage.init_db()
 
     # Create default project
-    api_storage.create_project(name="test-project")
+    if not api_storage.get_project():
+        api_storage.create_project(name="test-project")
+
+    with pytest.MonkeyPatch.context() as mp:
+        # Other modules may leave their own Storage on src.api; serve from the one seeded here
+        mp.setattr(api, "storage", api_storage)
+        http_client = make_http_client()
+        yield http_client
+        http_client.close()
+
+
+def clear_tables(db_path):
+    api_storage.db_path = str(db_path)
+    with api_storage.connection() as conn:
+        for table in ("tasks", "queues", "sessions"):
+            conn.execute(f"DELETE FROM {table}")
+
+
+@pytest.fixture
+def client(app_client, temp_db_path):
+    """Module-shared client with task, queue, and session rows cleared before each test"""
+    clear_tables(temp_db_path)
+    return app_client
+
+
+@pytest.fixture(scope="class")
+def seeded_client(app_client, temp_db_path):
+    """Read-only query tests share one seeded dataset per class.
+
+    30 tasks in one queue (even-indexed ones claimed) plus 21 sessions.
+    Returns (client, queue_id, task_ids).
+    """
+    clear_tables(temp_db_path)
+    session = api_storage.create_session(name="query-perf-session")
+    queue = api_storage.create_queue(session_id=session["id"], name="query-perf-queue")
+    tasks = api_storage.create_tasks_bulk(
+        [
+            {
+                "queue_id": queue["id"],
+                "tool_name": f"perf-tool-{i}",
+                "task_class": f"perf-class-{i}",
+                "payload": "{}",
+                "timeout": 300,
+            }
+            for i in range(30)
+        ]
+    )
+    for task in tasks[::2]:
+        api_storage.claim_task(task["id"])
+    with api_storage.bulk_transaction():
+        for i in range(20):
+            api_storage.create_session(name=f"perf-session-{i}")
+    return app_client, queue["id"], [task["id"] for task in tasks]
+
+
+@pytest.fixture
+def queue_id(client):
+    """Seed a session and queue directly through storage; HTTP setup isn't what these tests measure"""
+    session = api_storage.create_session(name="perf-session")
+    queue = api_storage.create_queue(session_id=session["id"], name="perf-queue")
+    return queue["id"]
 
-    return TestClient(app)
+
+@pytest.fixture(scope="module")
+def task_payload():
+    """Factory returning one reused create-task dict with queue/tool/class filled in.
+
+    Safe because client.post serializes the dict before the next call mutates it;
+    do not hold on to the returned dict across calls.
+    """
+    payload = {"queue_id": None, "tool_name": None, "task_class": None, "timeout": 300}
+
+    def make(queue_id, i, prefix):
+        payload["queue_id"] = queue_id
+        payload["tool_name"] = f"{prefix}-tool-{i}"
+        payload["task_class"] = f"{prefix}-class-{i}"
+        return payload
+
+    return make
 
 
 class TestThroughput:
     """Test system throughput and bulk operations"""
 
-    def test_create_tasks_bulk(self, client):
+    def test_create_tasks_bulk(self, client, queue_id):
         """
         Test creating 50+ tasks and verify persistence
         """
-        # Setup
-        session_resp = client.post(
-            "/api/sessions", json={"name": "bulk-session"}
-        )
-        session_id = session_resp.json()["session"]["id"]
-
-        stream_resp = client.post(
-            "/api/queues",
-            json={"session_id": session_id, "name": "bulk-queue"},
-        )
-        queue_id = stream_resp.json()["queue"]["id"]
-
-        # Create 50 tasks
-        task_ids = []
-        start_time = time.time()
-        for i in range(50):
-            task_resp = client.post(
-                "/api/tasks",
-                json={
+        # Create 50 tasks in a single bulk request
+        payload = {
+            "tasks": [
+                {
                     "queue_id": queue_id,
                     "tool_name": f"tool-{i}",
                     "task_class": f"class-{i}",
                     "timeout": 300,
-                },
-            )
-            assert task_resp.status_code == 200
-            task_ids.append(task_resp.json()["task"]["id"])
+                }
+                for i in range(50)
+            ]
+        }
+        rounds, warmup_rounds = 5, 1
+        creation_ns, bulk_resp = median_ns(
+            lambda: client.post("/api/tasks/bulk", json=payload),
+            rounds=rounds,
+            warmup_rounds=warmup_rounds,
+        )
+        assert bulk_resp.status_code == 200
+        created = bulk_resp.json()["tasks"]
+        task_ids = [task["id"] for task in created]
+        assert len(set(task_ids)) == 50
+        assert [task["tool_name"] for task in created] == [f"tool-{i}" for i in range(50)]
 
-        creation_time = time.time() - start_time
+        # Verify every round's tasks exist
+        count_resp = client.get(f"/api/tasks?queue_id={queue_id}&count_only=1")
+        assert count_resp.json()["count"] == 50 * (rounds + warmup_rounds)
 
-        # Verify all tasks exist
-        list_resp = client.get(f"/api/tasks?queue_id={queue_id}")
-        tasks = list_resp.json()["tasks"]
-        assert len(tasks) == 50
+        # Median bulk creation of 50 tasks should stay under 100ms
+        assert creation_ns < 100_000_000
 
-        # Verify creation completed in reasonable time (<5 seconds)
-        assert creation_time < 5.0
-
-    def test_claim_tasks_under_load(self, client):
+    @pytest.mark.asyncio
+    async def test_claim_tasks_under_load(self, client, queue_id):
         """
         Test claiming multiple tasks in rapid succession
         """
-        # Setup
-        session_resp = client.post(
-            "/api/sessions", json={"name": "load-session"}
-        )
-        session_id = session_resp.json()["session"]["id"]
-
-        stream_resp = client.post(
-            "/api/queues",
-            json={"session_id": session_id, "name": "load-queue"},
-        )
-        queue_id = stream_resp.json()["queue"]["id"]
-
         # Create 20 tasks
-        task_ids = []
-        for i in range(20):
-            task_resp = client.post(
-                "/api/tasks",
-                json={
-                    "queue_id": queue_id,
-                    "tool_name": f"load-tool-{i}",
-                    "task_class": f"load-class-{i}",
-                    "timeout": 300,
-                },
-            )
-            task_ids.append(task_resp.json()["task"]["id"])
+        bodies = task_bodies(queue_id, "load", 20)
+        task_ids = [client.post("/api/tasks?id_only=1", content=body, headers=JSON_HEADERS).text for body in bodies]
 
-        # Claim all tasks rapidly
-        start_time = time.time()
-        for task_id in task_ids:
-            claim_resp = client.post(f"/api/tasks/{task_id}/claim")
-            assert claim_resp.status_code == 200
-            assert claim_resp.json()["task"]["status"] == "running"
+        # Claim all tasks concurrently; validate responses outside the timed region
+        claim_urls = [f"/api/tasks/{task_id}/claim" for task_id in task_ids]
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            start_ns = time.perf_counter_ns()
+            claim_resps = await asyncio.gather(*(async_client.post(url) for url in claim_urls))
+            claim_ns = time.perf_counter_ns() - start_ns
 
-        claim_time = time.time() - start_time
+        assert all(resp.status_code == 200 for resp in claim_resps)
+        assert all(resp.json()["task"]["status"] == "running" for resp in claim_resps)
 
         # Verify all claimed
-        list_resp = client.get(f"/api/tasks?queue_id={queue_id}")
-        tasks = list_resp.json()["tasks"]
-        running_count = sum(1 for t in tasks if t["status"] == "running")
-        assert running_count == 20
+        count_resp = client.get(f"/api/tasks?queue_id={queue_id}&status=running&count_only=1")
+        assert count_resp.json()["count"] == 20
 
         # Verify claiming completed in reasonable time (<2 seconds)
-        assert claim_time < 2.0
+        assert claim_ns < 2_000_000_000
 
-    def test_complete_tasks_under_load(self, client):
+    def test_complete_tasks_under_load(self, client, queue_id):
         """
         Test completing multiple tasks in rapid succession
         """
-        # Setup
-        session_resp = client.post(
-            "/api/sessions", json={"name": "complete-load-session"}
-        )
-        session_id = session_resp.json()["session"]["id"]
-
-        stream_resp = client.post(
-            "/api/queues",
-            json={"session_id": session_id, "name": "complete-load-queue"},
-        )
-        queue_id = stream_resp.json()["queue"]["id"]
-
         # Create and claim 15 tasks
         task_ids = []
-        for i in range(15):
-            task_resp = client.post(
-                "/api/tasks",
-                json={
-                    "queue_id": queue_id,
-                    "tool_name": f"complete-tool-{i}",
-                    "task_class": f"complete-class-{i}",
-                    "timeout": 300,
-                },
-            )
-            task_id = task_resp.json()["task"]["id"]
+        for body in task_bodies(queue_id, "complete", 15):
+            task_id = client.post("/api/tasks?id_only=1", content=body, headers=JSON_HEADERS).text
             task_ids.append(task_id)
             client.post(f"/api/tasks/{task_id}/claim")
 
-        # Complete all tasks
-        start_time = time.time()
-        for i, task_id in enumerate(task_ids):
-            complete_resp = client.post(
-                f"/api/tasks/{task_id}/complete",
-                json={"result_summary": f"Result {i}"},
-            )
-            assert complete_resp.status_code == 200
-            assert complete_resp.json()["task"]["status"] == "succeeded"
+        # Complete all tasks; validate responses outside the timed region
+        completions = [
+            (f"/api/tasks/{task_id}/complete", {"result_summary": f"Result {i}"})
+            for i, task_id in enumerate(task_ids)
+        ]
+        start_ns = time.perf_counter_ns()
+        complete_resps = [client.post(url, json=body) for url, body in completions]
+        complete_ns = time.perf_counter_ns() - start_ns
 
-        complete_time = time.time() - start_time
+        assert all(resp.status_code == 200 for resp in complete_resps)
+        assert all(resp.json()["task"]["status"] == "succeeded" for resp in complete_resps)
 
         # Verify all completed
-        list_resp = client.get(f"/api/tasks?queue_id={queue_id}")
-        tasks = list_resp.json()["tasks"]
-        succeeded_count = sum(1 for t in tasks if t["status"] == "succeeded")
-        assert succeeded_count == 15
+        count_resp = client.get(f"/api/tasks?queue_id={queue_id}&status=succeeded&count_only=1")
+        assert count_resp.json()["count"] == 15
 
         # Verify completion completed in reasonable time (<1.5 seconds)
-        assert complete_time < 1.5
+        assert complete_ns < 1_500_000_000
 
 
 class TestQueryPerformance:
-    """Test query performance and response times"""
+    """Test query performance and response times against a shared, read-only dataset"""
 
-    def test_list_tasks_performance(self, client):
+    def test_list_tasks_performance(self, seeded_client):
         """
         Test listing tasks with pagination - verify reasonable response time
         """
-        # Setup with moderate data set
-        session_resp = client.post(
-            "/api/sessions", json={"name": "query-perf-session"}
-        )
-        session_id = session_resp.json()["session"]["id"]
-
-        stream_resp = client.post(
-            "/api/queues",
-            json={"session_id": session_id, "name": "query-perf-queue"},
-        )
-        queue_id = stream_resp.json()["queue"]["id"]
-
-        # Create 30 tasks
-        for i in range(30):
-            client.post(
-                "/api/tasks",
-                json={
-                    "queue_id": queue_id,
-                    "tool_name": f"perf-tool-{i}",
-                    "task_class": f"perf-class-{i}",
-                    "timeout": 300,
-                },
-            )
+        client, queue_id, _ = seeded_client
 
         # Test list performance
-        start_time = time.time()
-        list_resp = client.get(f"/api/tasks?queue_id={queue_id}")
-        query_time = time.time() - start_time
+        with read_only(api_storage):
+            query_ns, list_resp = median_ns(lambda: client.get(f"/api/tasks?queue_id={queue_id}"))
 
         assert list_resp.status_code == 200
         assert len(list_resp.json()["tasks"]) == 30
 
-        # Query should complete in < 200ms
-        assert query_time < 0.2
+        # Median query should complete in < 200ms
+        assert query_ns < 200_000_000
 
-    def test_get_single_task_performance(self, client):
+    def test_get_single_task_performance(self, seeded_client):
         """
-        Test getting a single task - verify sub-50ms response time
+        Test getting a single task - verify sub-50ms median and sub-100ms p95 response time
         """
-        # Setup
-        session_resp = client.post(
-            "/api/sessions", json={"name": "single-task-session"}
-        )
-        session_id = session_resp.json()["session"]["id"]
+        client, _, task_ids = seeded_client
+        task_id = task_ids[0]
+
+        # Sample the get 100 times and bound the median and p95
+        url = f"/api/tasks/{task_id}"
+        samples = []
+        with read_only(api_storage):
+            for _ in range(100):
+                start_ns = time.perf_counter_ns()
+                get_resp = client.get(url)
+                samples.append(time.perf_counter_ns() - start_ns)
+                assert get_resp.status_code == 200
 
-        stream_resp = client.post(
-            "/api/queues",
-            json={"session_id": session_id, "name": "single-task-queue"},
-        )
-        queue_id = stream_resp.json()["queue"]["id"]
-
-        task_resp = client.post(
-            "/api/tasks",
-            json={
-                "queue_id": queue_id,
-                "tool_name": "single-tool",
-                "task_class": "single-class",
-                "timeout": 300,
-            },
-        )
-        task_id = task_resp.json()["task"]["id"]
-
-        # Test get performance
-        start_time = time.time()
-        get_resp = client.get(f"/api/tasks/{task_id}")
-        query_time = time.time() - start_time
-
-        assert get_resp.status_code == 200
         assert get_resp.json()["task"]["id"] == task_id
 
-        # Single get should complete in < 50ms
-        assert query_time < 0.05
+        samples.sort()
+        p50, p95 = samples[50], samples[95]
+        assert p50 < 50_000_000, f"p50 {p50 / 1e6:.2f}ms"
+        assert p95 < 100_000_000, f"p95 {p95 / 1e6:.2f}ms"
 
-    def test_filter_tasks_by_status_performance(self, client):
+    def test_filter_tasks_by_status_performance(self, seeded_client):
         """
         Test filtering tasks by status - verify reasonable response time
         """
-        # Setup with mixed status tasks
-        session_resp = client.post(
-            "/api/sessions", json={"name": "filter-session"}
-        )
-        session_id = session_resp.json()["session"]["id"]
-
-        stream_resp = client.post(
-            "/api/queues",
-            json={"session_id": session_id, "name": "filter-queue"},
-        )
-        queue_id = stream_resp.json()["queue"]["id"]
-
-        # Create tasks with different statuses
-        for i in range(10):
-            task_resp = client.post(
-                "/api/tasks",
-                json={
-                    "queue_id": queue_id,
-                    "tool_name": f"filter-tool-{i}",
-                    "task_class": f"filter-class-{i}",
-                    "timeout": 300,
-                },
-            )
-            task_id = task_resp.json()["task"]["id"]
-
-            # Mark some as running
-            if i % 2 == 0:
-                client.post(f"/api/tasks/{task_id}/claim")
+        client, _, _ = seeded_client
 
         # Test filter by status performance
-        start_time = time.time()
-        queued_resp = client.get("/api/tasks?status=queued")
-        query_time = time.time() - start_time
+        with read_only(api_storage):
+            query_ns, queued_resp = median_ns(lambda: client.get("/api/tasks?status=queued"))
 
         assert queued_resp.status_code == 200
         queued_tasks = queued_resp.json()["tasks"]
-        assert all(t["status"] == "queued" for t in queued_tasks)
+        # Non-empty guard keeps the subset check from passing vacuously
+        assert len(queued_tasks) > 0
+        assert {t["status"] for t in queued_tasks} <= {"queued"}
 
-        # Filter should complete in < 200ms
-        assert query_time < 0.2
+        # Median filter should complete in < 200ms
+        assert query_ns < 200_000_000
 
-    def test_list_sessions_performance(self, client):
+    def test_list_sessions_performance(self, seeded_client):
         """
         Test listing sessions - verify reasonable response time with multiple sessions
         """
-        # Create 20 sessions
-        for i in range(20):
-            client.post("/api/sessions", json={"name": f"perf-session-{i}"})
+        client, _, _ = seeded_client
 
         # Test list performance
-        start_time = time.time()
-        list_resp = client.get("/api/sessions")
-        query_time = time.time() - start_time
+        with read_only(api_storage):
+            query_ns, list_resp = median_ns(lambda: client.get("/api/sessions"))
 
         assert list_resp.status_code == 200
         assert len(list_resp.json()["sessions"]) >= 20
 
-        # List should complete in < 100ms
-        assert query_time < 0.1
+        # Median list should complete in < 100ms
+        assert query_ns < 100_000_000
 
 
 class TestConcurrentOperations:
     """Test behavior under concurrent load"""
 
-    def test_sequential_task_claims_success(self, client):
+    def test_sequential_task_claims_success(self, client, queue_id, task_payload):
         """
         Test that sequential task claims don't interfere with each other
         """
-        # Setup
-        session_resp = client.post(
-            "/api/sessions", json={"name": "concurrent-session"}
-        )
-        session_id = session_resp.json()["session"]["id"]
-
-        stream_resp = client.post(
-            "/api/queues",
-            json={"session_id": session_id, "name": "concurrent-queue"},
-        )
-        queue_id = stream_resp.json()["queue"]["id"]
-
         # Create multiple tasks
         task_ids = []
         for i in range(5):
-            task_resp = client.post(
-                "/api/tasks",
-                json={
-                    "queue_id": queue_id,
-                    "tool_name": f"concurrent-tool-{i}",
-                    "task_class": f"concurrent-class-{i}",
-                    "timeout": 300,
-                },
-            )
-            task_ids.append(task_resp.json()["task"]["id"])
+            task_ids.append(client.post("/api/tasks?id_only=1", json=task_payload(queue_id, i, "concurrent")).text)
 
         # Claim tasks sequentially
         for task_id in task_ids:
@@ -359,22 +392,10 @@ class TestConcurrentOperations:
         tasks = list_resp.json()["tasks"]
         assert all(t["status"] == "running" for t in tasks)
 
-    def test_mixed_operations_sequence(self, client):
+    def test_mixed_operations_sequence(self, client, queue_id):
         """
         Test mixed sequence of create, claim, complete operations
         """
-        # Setup
-        session_resp = client.post(
-            "/api/sessions", json={"name": "mixed-session"}
-        )
-        session_id = session_resp.json()["session"]["id"]
-
-        stream_resp = client.post(
-            "/api/queues",
-            json={"session_id": session_id, "name": "mixed-queue"},
-        )
-        queue_id = stream_resp.json()["queue"]["id"]
-
         # Create first task
         task1_resp = client.post(
             "/api/tasks",
@@ -410,33 +431,19 @@ class TestConcurrentOperations:
         # Claim second task
         client.post(f"/api/tasks/{task2_id}/claim")
 
-        # Verify states
-        task1_get = client.get(f"/api/tasks/{task1_id}")
-        task2_get = client.get(f"/api/tasks/{task2_id}")
-
-        assert task1_get.json()["task"]["status"] == "succeeded"
-        assert task2_get.json()["task"]["status"] == "running"
+        # Verify states with one list query
+        tasks_by_id = {t["id"]: t for t in client.get(f"/api/tasks?queue_id={queue_id}").json()["tasks"]}
+        assert tasks_by_id[task1_id]["status"] == "succeeded"
+        assert tasks_by_id[task2_id]["status"] == "running"
 
 
 class TestDataIntegrityUnderLoad:
     """Test data integrity under load conditions"""
 
-    def test_task_attempt_tracking_under_load(self, client):
+    def test_task_attempt_tracking_under_load(self, client, queue_id):
         """
         Test that task attempts are tracked correctly under load
         """
-        # Setup
-        session_resp = client.post(
-            "/api/sessions", json={"name": "attempt-session"}
-        )
-        session_id = session_resp.json()["session"]["id"]
-
-        stream_resp = client.post(
-            "/api/queues",
-            json={"session_id": session_id, "name": "attempt-queue"},
-        )
-        queue_id = stream_resp.json()["queue"]["id"]
-
         # Create task
         task_resp = client.post(
             "/api/tasks",
@@ -449,55 +456,39 @@ class TestDataIntegrityUnderLoad:
         )
         task_id = task_resp.json()["task"]["id"]
 
-        # Claim and fail multiple times
+        # Claim and fail three times, requeueing between attempts, in one transaction
+        actions = []
         for i in range(3):
-            client.post(f"/api/tasks/{task_id}/claim")
-            client.post(
-                f"/api/tasks/{task_id}/fail",
-                json={"error_message": f"Attempt {i+1} failed"},
-            )
+            actions.append({"action": "claim"})
+            actions.append({"action": "fail", "error_message": f"Attempt {i+1} failed"})
             if i < 2:  # Requeue for next attempt
-                client.post(f"/api/tasks/{task_id}/requeue")
-
-        # Get final task state
-        final_resp = client.get(f"/api/tasks/{task_id}")
-        task = final_resp.json()["task"]
-
-        assert task["status"] == "failed"
-
-    def test_queue_task_count_consistency(self, client):
+                actions.append({"action": "requeue"})
+        transitions_resp = client.post(f"/api/tasks/{task_id}/transitions", json={"actions": actions})
+        assert transitions_resp.status_code == 200
+        last_task = transitions_resp.json()["task"]
+        assert last_task["id"] != task_id
+        assert last_task["error_message"] == "Attempt 3 failed"
+
+        # Original plus two requeued copies, each failed once
+        count_resp = client.get(f"/api/tasks?queue_id={queue_id}&status=failed&count_only=1")
+        assert count_resp.json()["count"] == 3
+        assert client.get(f"/api/tasks/{task_id}").json()["task"]["status"] == "failed"
+
+    def test_queue_task_count_consistency(self, client, queue_id, task_payload):
         """
         Test that task counts are consistent for queues
         """
-        # Setup
-        session_resp = client.post(
-            "/api/sessions", json={"name": "count-session"}
-        )
-        session_id = session_resp.json()["session"]["id"]
-
-        stream_resp = client.post(
-            "/api/queues",
-            json={"session_id": session_id, "name": "count-queue"},
-        )
-        queue_id = stream_resp.json()["queue"]["id"]
-
         # Create tasks in batches
         total_created = 0
         for batch in range(3):
             for i in range(10):
-                client.post(
-                    "/api/tasks",
-                    json={
-                        "queue_id": queue_id,
-                        "tool_name": f"count-tool-{batch}-{i}",
-                        "task_class": "count-class",
-                        "timeout": 300,
-                    },
-                )
+                client.post("/api/tasks", json=task_payload(queue_id, i, f"count-{batch}"))
                 total_created += 1
 
             # Verify count after each batch
-            list_resp = client.get(f"/api/tasks?queue_id={queue_id}")
-            tasks = list_resp.json()["tasks"]
-            assert len(tasks) == total_created
-            assert all(t["queue_id"] == queue_id for t in tasks)
+            count_resp = client.get(f"/api/queues/{queue_id}/count")
+            assert count_resp.json()["count"] == total_created
+
+        tasks = client.get(f"/api/tasks?queue_id={queue_id}").json()["tasks"]
+        assert len(tasks) == total_created
+        assert all(t["queue_id"] == queue_id for t in tasks)
@@ -4,22 +4,92 @@ Comprehensive integration tests for complete workflows, data consistency,
 and error recovery across the entire system.
 """
 
+import asyncio
+import sqlite3
+from uuid import uuid4
+
+import httpx
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
 
+from src import api
 from src.api import app, storage as api_storage
 
 
-@pytest.fixture
-def client(temp_db_path):
-    """Create a test client with isolated database"""
-    api_storage.db_path = str(temp_db_path)
-    api_storage.init_db()
+# Static task-create fields; tests add queue_id (and override as needed)
+BASE_TASK_KW = {"tool_name": "test-tool", "task_class": "test-class", "timeout": 300}
+
+
+def seed_queues_and_tasks(storage, session_id, n_queues, n_tasks, prefix="queue"):
+    """Create n_queues queues with n_tasks tasks each straight through storage, in one transaction.
+
+    Returns {queue_id: [task_id, ...]} in creation order.
+    """
+    seeded = {}
+    with storage.bulk_transaction():
+        for queue_idx in range(n_queues):
+            queue = storage.create_queue(session_id=session_id, name=f"{prefix}-{queue_idx}")
+            tasks = storage.create_tasks_bulk(
+                [
+                    {
+                        **BASE_TASK_KW,
+                        "queue_id": queue["id"],
+                        "tool_name": f"{prefix}-{queue_idx}-task-{task_idx}",
+                        "payload": "{}",
+                    }
+                    for task_idx in range(n_tasks)
+                ]
+            )
+            seeded[queue["id"]] = [task["id"] for task in tasks]
+    return seeded
+
+
+@pytest.fixture(scope="module")
+def _schema(worker_id):
+    """In-memory database with schema and default project, built once for the module.
+
+    Yields the database URI. An anchor connection keeps the shared-cache DB alive;
+    the name is keyed on the xdist worker so parallel workers never share it.
+    """
+    uri = f"file:sparkq_{worker_id}_{uuid4().hex}?mode=memory&cache=shared"
+    anchor = sqlite3.connect(uri, uri=True)
+    with pytest.MonkeyPatch.context() as mp:
+        # Restore the shared Storage's path afterwards so later modules don't inherit this DB
+        mp.setattr(api_storage, "db_path", uri)
+        api_storage.init_db()
+
+        # Create default project
+        api_storage.create_project(name="test-project")
+
+        # Other modules may leave their own Storage on src.api; serve from this one
+        mp.setattr(api, "storage", api_storage)
+        yield uri
+    anchor.close()
+
+
+@pytest.fixture(scope="module")
+def client(_schema):
+    """One test client for the module; the app lifespan is entered once"""
+    with TestClient(app) as test_client:
+        yield test_client
 
-    # Create default project
-    api_storage.create_project(name="test-project")
 
-    return TestClient(app)
+@pytest_asyncio.fixture
+async def async_client(_schema):
+    """Async client on the same app, for tests that fire independent requests concurrently"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def reset_db(_schema):
+    """Wipe session, queue, and task rows from the module database before each test"""
+    api_storage.db_path = _schema
+    with api_storage.connection() as conn:
+        for table in ("tasks", "queues", "sessions"):
+            conn.execute(f"DELETE FROM {table}")
 
 
 class TestCompleteSessionWorkflow:
@@ -56,12 +126,7 @@ class TestCompleteSessionWorkflow:
         # Step 3: Create task under queue
         task_resp = client.post(
             "/api/tasks",
-            json={
-                "queue_id": queue_id,
-                "tool_name": "workflow-tool",
-                "task_class": "workflow-class",
-                "timeout": 300,
-            },
+            json={"queue_id": queue_id, **BASE_TASK_KW},
         )
         assert task_resp.status_code == 200
         task_id = task_resp.json()["task"]["id"]
@@ -115,12 +180,7 @@ class TestCompleteSessionWorkflow:
 
         task_resp = client.post(
             "/api/tasks",
-            json={
-                "queue_id": queue_id,
-                "tool_name": "failure-tool",
-                "task_class": "failure-class",
-                "timeout": 300,
-            },
+            json={"queue_id": queue_id, **BASE_TASK_KW},
         )
         task_id = task_resp.json()["task"]["id"]
 
@@ -147,13 +207,9 @@ class TestCompleteSessionWorkflow:
         assert new_task_id != task_id
         assert requeue_resp.json()["task"]["status"] == "queued"
 
-        # Verify original task still shows failed
-        get_resp = client.get(f"/api/tasks/{task_id}")
-        assert get_resp.json()["task"]["status"] == "failed"
-
-        # Verify new task is queued
-        new_get_resp = client.get(f"/api/tasks/{new_task_id}")
-        assert new_get_resp.json()["task"]["status"] == "queued"
+        # Verify persisted state: original task still failed, new task queued
+        assert api_storage.get_task(task_id)["status"] == "failed"
+        assert api_storage.get_task(new_task_id)["status"] == "queued"
 
     def test_multiple_task_completion_in_stream(self, client):
         """
@@ -163,31 +219,9 @@ class TestCompleteSessionWorkflow:
         3. Complete tasks with different results
         4. Verify task states
         """
-        # Step 1: Create session and queue
-        session_resp = client.post(
-            "/api/sessions", json={"name": "multi-task-session"}
-        )
-        session_id = session_resp.json()["session"]["id"]
-
-        queue_resp = client.post(
-            "/api/queues",
-            json={"session_id": session_id, "name": "multi-queue"},
-        )
-        queue_id = queue_resp.json()["queue"]["id"]
-
-        # Step 2: Create 3 tasks
-        task_ids = []
-        for i in range(3):
-            task_resp = client.post(
-                "/api/tasks",
-                json={
-                    "queue_id": queue_id,
-                    "tool_name": f"tool-{i}",
-                    "task_class": f"class-{i}",
-                    "timeout": 300,
-                },
-            )
-            task_ids.append(task_resp.json()["task"]["id"])
+        # Steps 1-2: Seed a session with one queue of 3 tasks
+        session = api_storage.create_session(name="multi-task-session")
+        ((queue_id, task_ids),) = seed_queues_and_tasks(api_storage, session["id"], 1, 3, prefix="multi").items()
 
         # Step 3: Process tasks with different outcomes
         # Task 0: Complete successfully
@@ -215,7 +249,8 @@ class TestCompleteSessionWorkflow:
 class TestMultiStreamIsolation:
     """Test that queues and their tasks are properly isolated"""
 
-    def test_multi_stream_isolation(self, client):
+    @pytest.mark.asyncio
+    async def test_multi_stream_isolation(self, async_client):
         """
         Test queue isolation:
         1. Create session with multiple queues
@@ -223,41 +258,15 @@ class TestMultiStreamIsolation:
         3. Filter tasks by queue
         4. Verify tasks are isolated per queue
         """
-        # Step 1: Create session
-        session_resp = client.post(
-            "/api/sessions", json={"name": "isolation-session"}
-        )
-        session_id = session_resp.json()["session"]["id"]
-
-        # Step 2: Create multiple queues
-        stream_ids = []
-        for i in range(3):
-            queue_resp = client.post(
-                "/api/queues",
-                json={"session_id": session_id, "name": f"queue-{i}"},
-            )
-            stream_ids.append(queue_resp.json()["queue"]["id"])
-
-        # Step 3: Create tasks in each queue
-        stream_task_map = {}
-        for stream_idx, queue_id in enumerate(stream_ids):
-            task_ids = []
-            for task_idx in range(2):
-                task_resp = client.post(
-                    "/api/tasks",
-                    json={
-                        "queue_id": queue_id,
-                        "tool_name": f"queue-{stream_idx}-task-{task_idx}",
-                        "task_class": "test-class",
-                        "timeout": 300,
-                    },
-                )
-                task_ids.append(task_resp.json()["task"]["id"])
-            stream_task_map[queue_id] = task_ids
+        # Steps 1-3: Seed a session with 3 queues of 2 tasks each
+        session = api_storage.create_session(name="isolation-session")
+        stream_task_map = seed_queues_and_tasks(api_storage, session["id"], 3, 2)
 
         # Step 4: Filter tasks by queue and verify isolation
-        for queue_id, expected_task_ids in stream_task_map.items():
-            tasks_resp = client.get(f"/api/tasks?queue_id={queue_id}")
+        queue_resps = await asyncio.gather(
+            *(async_client.get(f"/api/tasks?queue_id={queue_id}") for queue_id in stream_task_map)
+        )
+        for (queue_id, expected_task_ids), tasks_resp in zip(stream_task_map.items(), queue_resps):
             tasks = tasks_resp.json()["tasks"]
 
             # Verify correct number of tasks
@@ -271,7 +280,8 @@ class TestMultiStreamIsolation:
             expected_set = set(expected_task_ids)
             assert actual_task_ids == expected_set
 
-    def test_queues_isolated_across_sessions(self, client):
+    @pytest.mark.asyncio
+    async def test_queues_isolated_across_sessions(self, async_client):
         """
         Test that queues from different sessions are properly isolated:
         1. Create 2 sessions
@@ -279,25 +289,29 @@ class TestMultiStreamIsolation:
         3. Verify queues are isolated
         """
         # Step 1: Create 2 sessions
-        session_ids = []
-        for i in range(2):
-            resp = client.post("/api/sessions", json={"name": f"session-{i}"})
-            session_ids.append(resp.json()["session"]["id"])
+        session_resps = await asyncio.gather(
+            *(async_client.post("/api/sessions", json={"name": f"session-{i}"}) for i in range(2))
+        )
+        session_ids = [resp.json()["session"]["id"] for resp in session_resps]
 
         # Step 2: Create queues in each session
-        session_stream_map = {}
-        for session_id in session_ids:
-            queue_resp = client.post(
-                "/api/queues",
-                json={"session_id": session_id, "name": f"queue-for-{session_id}"},
+        queue_resps = await asyncio.gather(
+            *(
+                async_client.post(
+                    "/api/queues",
+                    json={"session_id": session_id, "name": f"queue-for-{session_id}"},
+                )
+                for session_id in session_ids
             )
-            queue_id = queue_resp.json()["queue"]["id"]
-            session_stream_map[session_id] = queue_id
+        )
+        session_stream_map = {
+            session_id: resp.json()["queue"]["id"] for session_id, resp in zip(session_ids, queue_resps)
+        }
 
-        # Step 3: Verify queues are isolated by session
+        # Step 3: Verify queues are isolated by session (read from storage; the
+        # session_id filter on GET /api/queues is covered in test_api.py)
         for session_id, expected_stream_id in session_stream_map.items():
-            streams_resp = client.get(f"/api/queues?session_id={session_id}")
-            queues = streams_resp.json()["queues"]
+            queues = api_storage.list_queues(session_id=session_id)
 
             # All queues should belong to this session
             assert all(s["session_id"] == session_id for s in queues)
@@ -330,12 +344,7 @@ class TestDataConsistency:
 
         task_resp = client.post(
             "/api/tasks",
-            json={
-                "queue_id": queue_id,
-                "tool_name": "persist-tool",
-                "task_class": "persist-class",
-                "timeout": 300,
-            },
+            json={"queue_id": queue_id, **BASE_TASK_KW},
         )
         task_id = task_resp.json()["task"]["id"]
 
@@ -344,20 +353,14 @@ class TestDataConsistency:
         client.post(f"/api/tasks/{task_id}/complete", json={"result_summary": "Done"})
 
         # Step 3: Verify data persists
-        # Re-fetch all entities and verify they exist with correct data
-        session_check = client.get(f"/api/sessions/{session_id}")
-        assert session_check.status_code == 200
-        assert session_check.json()["session"]["name"] == "persist-session"
-
-        stream_check = client.get(f"/api/queues/{queue_id}")
-        assert stream_check.status_code == 200
-        assert stream_check.json()["queue"]["name"] == "persist-queue"
-
-        task_check = client.get(f"/api/tasks/{task_id}")
-        assert task_check.status_code == 200
-        task = task_check.json()["task"]
-        assert task["status"] == "succeeded"
-        assert task["result_summary"] == "Done"
+        # Re-fetch task, queue, and session from storage in one query
+        full = api_storage.get_full_task(task_id)
+        assert full["session"]["id"] == session_id
+        assert full["session"]["name"] == "persist-session"
+        assert full["queue"]["id"] == queue_id
+        assert full["queue"]["name"] == "persist-queue"
+        assert full["task"]["status"] == "succeeded"
+        assert full["task"]["result"] == "Done"  # API exposes this as result_summary
 
     def test_task_status_transitions(self, client):
         """
@@ -383,12 +386,7 @@ class TestDataConsistency:
         # Test path 1: queued → running → succeeded
         task1_resp = client.post(
             "/api/tasks",
-            json={
-                "queue_id": queue_id,
-                "tool_name": "tool1",
-                "task_class": "class1",
-                "timeout": 300,
-            },
+            json={"queue_id": queue_id, **BASE_TASK_KW},
         )
         task1_id = task1_resp.json()["task"]["id"]
         assert task1_resp.json()["task"]["status"] == "queued"
@@ -408,12 +406,7 @@ class TestDataConsistency:
         # Test path 2: queued → running → failed → queued
         task2_resp = client.post(
             "/api/tasks",
-            json={
-                "queue_id": queue_id,
-                "tool_name": "tool2",
-                "task_class": "class2",
-                "timeout": 300,
-            },
+            json={"queue_id": queue_id, **BASE_TASK_KW},
         )
         task2_id = task2_resp.json()["task"]["id"]
 
@@ -434,28 +427,9 @@ class TestDataConsistency:
         2. Query queue and verify it exists
         3. Query tasks and verify they belong to queue
         """
-        # Step 1: Create session with queue and tasks
-        session_resp = client.post(
-            "/api/sessions", json={"name": "query-test-session"}
-        )
-        session_id = session_resp.json()["session"]["id"]
-
-        queue_resp = client.post(
-            "/api/queues",
-            json={"session_id": session_id, "name": "query-test-queue"},
-        )
-        queue_id = queue_resp.json()["queue"]["id"]
-
-        task_resp = client.post(
-            "/api/tasks",
-            json={
-                "queue_id": queue_id,
-                "tool_name": "query-tool",
-                "task_class": "query-class",
-                "timeout": 300,
-            },
-        )
-        task_id = task_resp.json()["task"]["id"]
+        # Step 1: Seed session with queue and task
+        session_id = api_storage.create_session(name="query-test-session")["id"]
+        ((queue_id, (task_id,)),) = seed_queues_and_tasks(api_storage, session_id, 1, 1, prefix="query").items()
 
         # Step 2: Verify all exist
         assert client.get(f"/api/sessions/{session_id}").status_code == 200
@@ -476,6 +450,15 @@ class TestDataConsistency:
         assert any(t["id"] == task_id for t in tasks)
 
 
+@pytest.fixture
+def seeded_task(client):
+    """Yield (client, task_id, queue_id, session_id) for a queued task built directly in storage."""
+    session = api_storage.create_session(name="error-recovery-session")
+    queue = api_storage.create_queue(session_id=session["id"], name="error-recovery-queue")
+    task = api_storage.create_task(queue_id=queue["id"], payload="{}", **BASE_TASK_KW)
+    yield client, task["id"], queue["id"], session["id"]
+
+
 class TestErrorRecovery:
     """Test error handling and recovery scenarios"""
 
@@ -500,33 +483,12 @@ class TestErrorRecovery:
         response = client.post("/api/tasks/invalid-id/claim")
         assert response.status_code == 404
 
-    def test_complete_task_without_claiming(self, client):
+    def test_complete_task_without_claiming(self, seeded_task):
         """
         Test completing a task that hasn't been claimed:
         Should fail since task must be in 'running' state
         """
-        # Setup
-        session_resp = client.post(
-            "/api/sessions", json={"name": "unclaimed-session"}
-        )
-        session_id = session_resp.json()["session"]["id"]
-
-        queue_resp = client.post(
-            "/api/queues",
-            json={"session_id": session_id, "name": "unclaimed-queue"},
-        )
-        queue_id = queue_resp.json()["queue"]["id"]
-
-        task_resp = client.post(
-            "/api/tasks",
-            json={
-                "queue_id": queue_id,
-                "tool_name": "unclaimed-tool",
-                "task_class": "unclaimed-class",
-                "timeout": 300,
-            },
-        )
-        task_id = task_resp.json()["task"]["id"]
+        client, task_id, _, _ = seeded_task
 
         # Try to complete without claiming
         complete_resp = client.post(
@@ -537,33 +499,12 @@ class TestErrorRecovery:
         # Should fail with 400 or similar error (task not in running state)
         assert complete_resp.status_code in (400, 409, 500)
 
-    def test_fail_task_allows_any_status(self, client):
+    def test_fail_task_allows_any_status(self, seeded_task):
         """
         Test that failing a task is allowed regardless of status
         (API doesn't enforce task must be in 'running' state)
         """
-        # Setup
-        session_resp = client.post(
-            "/api/sessions", json={"name": "fail-test-session"}
-        )
-        session_id = session_resp.json()["session"]["id"]
-
-        queue_resp = client.post(
-            "/api/queues",
-            json={"session_id": session_id, "name": "fail-test-queue"},
-        )
-        queue_id = queue_resp.json()["queue"]["id"]
-
-        task_resp = client.post(
-            "/api/tasks",
-            json={
-                "queue_id": queue_id,
-                "tool_name": "fail-test-tool",
-                "task_class": "fail-test-class",
-                "timeout": 300,
-            },
-        )
-        task_id = task_resp.json()["task"]["id"]
+        client, task_id, _, _ = seeded_task
 
         # Fail without claiming (task is in 'queued' state)
         fail_resp = client.post(
@@ -582,11 +523,7 @@ class TestErrorRecovery:
         """
         response = client.post(
             "/api/tasks",
-            json={
-                "tool_name": "test-tool",
-                "task_class": "test-class",
-                "timeout": 300,
-            },
+            json=BASE_TASK_KW,
         )
         assert response.status_code == 400
 
@@ -1,23 +1,26 @@
+import re
+
 import pytest
 from fastapi.testclient import TestClient
 
 from src.storage import Storage
 
+_NAV_PATTERN = re.compile(rb"""data-action=["'](nav-dashboard|nav-settings)["']""")
+
 
 @pytest.fixture
-def ui_client(tmp_path, monkeypatch):
+def ui_client(tmp_path, memory_db_uri, monkeypatch):
   """
   Minimal FastAPI TestClient for UI smoke checks.
   """
-  db_path = tmp_path / "ui_smoke.db"
-  monkeypatch.setenv("SPARKQ_DB", str(db_path))
+  monkeypatch.setenv("SPARKQ_DB", memory_db_uri)
 
-  storage = Storage(str(db_path))
+  storage = Storage(memory_db_uri)
   storage.init_db()
   storage.create_project(name="ui-smoke", repo_path=str(tmp_path), prd_path=None)
 
   from src import api
-  api.storage = storage
+  monkeypatch.setattr(api, "storage", storage)
 
   yield TestClient(api.app)
 
@@ -30,7 +33,5 @@ def test_delegated_actions_present(ui_client):
   # Load dashboard
   resp = ui_client.get("/ui/")
   assert resp.status_code == 200
-  html = resp.text
-  # Basic presence checks
-  assert ("data-action=\"nav-dashboard\"" in html) or ("data-action='nav-dashboard'" in html)
-  assert ("data-action=\"nav-settings\"" in html) or ("data-action='nav-settings'" in html)
+  # Basic presence checks: both nav actions, either quote style, in one pass
+  assert set(_NAV_PATTERN.findall(resp.content)) == {b"nav-dashboard", b"nav-settings"}
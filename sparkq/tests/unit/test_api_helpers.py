@@ -1,7 +1,13 @@
 """Unit tests for API helper functions"""
 
+import json
+
 import pytest
-from src.api import _format_error, _error_response, _serialize_task, storage
+from src.api_helpers import _format_error, _error_response, _serialize_task
+
+
+def _decode(response):
+    return json.loads(response.body)
 
 
 class TestErrorFormatting:
@@ -31,33 +37,39 @@ class TestErrorResponse:
         response = _error_response("Test error", 400)
         assert response.status_code == 400
 
-        body = response.body.decode()
-        assert "error" in body
-        assert "status" in body
-        assert "Test error" in body
+        body = _decode(response)
+        assert body == {"error": "Error: Test error", "status": 400}
 
     def test_error_response_with_none_message(self):
         response = _error_response(None, 500)
         assert response.status_code == 500
 
-        body = response.body.decode()
-        assert "Internal server error" in body
+        assert "Internal server error" in _decode(response)["error"]
 
-    def test_error_response_formats_status_codes(self):
-        for code in [400, 404, 500]:
-            response = _error_response("Test", code)
-            assert response.status_code == code
-            body = response.body.decode()
-            assert str(code) in body
+    @pytest.mark.parametrize("code", [400, 404, 500])
+    def test_error_response_formats_status_codes(self, code):
+        response = _error_response("Test", code)
+        assert response.status_code == code
+        assert _decode(response)["status"] == code
 
 
 class TestSerializeTask:
-    def test_serialize_task_prefers_prefetched_queue_names(self, monkeypatch):
-        # If queue_names is provided, storage lookup should be skipped.
-        monkeypatch.setattr(storage, "get_queue", lambda queue_id: (_ for _ in ()).throw(AssertionError("get_queue called")))
+    def test_serialize_task_prefers_prefetched_queue_names(self):
+        # If queue_names is provided, the queue lookup should be skipped.
+        def get_queue(queue_id):
+            raise AssertionError("get_queue called")
+
         task = {"id": "tsk_1234", "queue_id": "que_1", "status": "queued"}
 
-        serialized = _serialize_task(task, {"que_1": "Inbox"})
+        serialized = _serialize_task(task, {"que_1": "Inbox"}, get_queue=get_queue)
 
         assert serialized["friendly_id"] == "INBOX-1234"
         assert serialized["claimed_at"] is None
+
+    def test_serialize_task_falls_back_to_queue_lookup(self):
+        task = {"id": "tsk_5678", "queue_id": "que_2", "status": "succeeded", "finished_at": "2024-01-01T00:00:00Z"}
+
+        serialized = _serialize_task(task, get_queue=lambda queue_id: {"name": "backlog"})
+
+        assert serialized["friendly_id"] == "BACKLOG-5678"
+        assert serialized["completed_at"] == "2024-01-01T00:00:00Z"
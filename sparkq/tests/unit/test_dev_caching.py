@@ -1,25 +1,34 @@
+import sqlite3
+from uuid import uuid4
+
 import pytest
 from fastapi.testclient import TestClient
 
 from src.storage import Storage
 
 
-@pytest.fixture
-def dev_client(tmp_path, monkeypatch):
-    """FastAPI test client scoped to a temp DB to avoid mutating real data."""
-    db_path = tmp_path / "cache_test.db"
-    storage = Storage(str(db_path))
+@pytest.fixture(scope="module")
+def dev_client():
+    """FastAPI test client in dev mode, scoped to an in-memory DB to avoid mutating real data.
+
+    Built once for the module; env, APP_ENV and api.storage are restored afterwards.
+    """
+    uri = f"file:sparkq_{uuid4().hex}?mode=memory&cache=shared"
+    anchor = sqlite3.connect(uri, uri=True)
+    storage = Storage(uri)
     storage.init_db()
 
     from src import api
     from src import env as env_module
 
+    with pytest.MonkeyPatch.context() as mp:
+        env_module.reset_env_cache()
+        mp.setenv("SPARKQ_ENV", "dev")
+        mp.setattr(api, "APP_ENV", env_module.get_app_env())
+        mp.setattr(api, "storage", storage)
+        yield TestClient(api.app)
     env_module.reset_env_cache()
-    monkeypatch.setenv("SPARKQ_ENV", "dev")
-    api.APP_ENV = env_module.get_app_env()
-
-    api.storage = storage
-    return TestClient(api.app)
+    anchor.close()
 
 
 def test_static_files_send_no_cache_headers_in_dev(dev_client):
@@ -37,10 +46,10 @@ def test_cache_buster_endpoint_exposes_env_and_cache_buster(dev_client):
     assert response.status_code == 200
     assert "application/javascript" in response.headers.get("content-type", "")
 
-    body = response.text
-    assert 'window.__SPARKQ_ENV__ = "dev";' in body
-    assert "window.__SPARKQ_CACHE_BUSTER__" in body
-    assert "window.__SPARKQ_BUILD_ID__" in body
+    body = response.content
+    assert b'window.__SPARKQ_ENV__ = "dev";' in body
+    assert b"window.__SPARKQ_CACHE_BUSTER__" in body
+    assert b"window.__SPARKQ_BUILD_ID__" in body
 
     # Dev endpoint should also enforce no-cache headers
     assert response.headers.get("Cache-Control") == "no-cache, no-store, must-revalidate, max-age=0"
@@ -1,6 +1,7 @@
 """Unit tests for the ScriptIndex helper."""
 
 import logging
+import sqlite3
 from pathlib import Path
 
 import pytest
@@ -167,3 +168,112 @@ class TestScriptIndex:
 
         assert "invalid timeout" in caplog.text.lower()
         assert metadata["timeout"] == -10  # Still parsed, but warned
+
+    def test_header_longer_than_one_read(self, tmp_path: Path):
+        """Headers spanning several read chunks are parsed in full."""
+        script = tmp_path / "long.sh"
+        filler = "".join(f"# note line {i}\n" for i in range(ScriptIndex.HEADER_READ_BYTES // 10))
+        script.write_text("#!/bin/bash\n" + filler + "# name: long-header\n" + "echo 'done'\n")
+
+        index = ScriptIndex(config_path=str(tmp_path / "sparkq.yml"))
+
+        assert index.parse_script_header(script)["name"] == "long-header"
+
+    def test_build_indexes_nested_and_shebang_only_scripts(self, script_index: ScriptIndex, tmp_path: Path):
+        nested = tmp_path / "scripts" / "nested"
+        nested.mkdir()
+        (nested / "runme").write_text("#!/bin/sh\n# name: runme\necho hi\n")
+        (nested / "notes").write_text("plain text, not a script\n")
+
+        script_index.rebuild()
+
+        assert script_index.get_script("runme")["path"] == str(nested / "runme")
+        assert script_index.get_script("notes") is None
+
+    def test_rebuild_reparses_only_changed_scripts(self, script_index: ScriptIndex, tmp_path: Path):
+        deploy = tmp_path / "scripts" / "deploy.sh"
+        unchanged_before = script_index.get_script("test-script")
+
+        deploy.write_text("#!/bin/bash\n# name: deploy-production\necho 'deploying'\n")
+        script_index.rebuild()
+
+        assert script_index.get_script("test-script") is unchanged_before
+        assert script_index.get_script("deploy-production") is not None
+        assert script_index.get_script("deploy-staging") is None
+
+    def test_search_sees_rebuilt_entries_with_same_script_count(self, script_index: ScriptIndex, tmp_path: Path):
+        assert script_index.search("staging")
+
+        (tmp_path / "scripts" / "deploy.sh").write_text(
+            "#!/bin/bash\n# name: deploy-staging\n# description: Deploy to production\necho 'deploying'\n"
+        )
+        script_index.rebuild()
+
+        assert [entry["name"] for entry in script_index.search("production")] == ["deploy-staging"]
+        assert script_index.get_script("deploy-staging")["description"] == "Deploy to production"
+
+    def test_search_matches_substrings_within_single_fields(self, script_index: ScriptIndex):
+        assert {entry["name"] for entry in script_index.search("STAG")} == {"deploy-staging"}
+        assert {entry["name"] for entry in script_index.search("suite")} == {"test-runner"}
+        # Matches never span two fields (name "test-script" + description "Test script...")
+        assert script_index.search("test-scripttest") == []
+
+    def test_build_parses_large_directories_in_order(self, tmp_path: Path):
+        scripts_dir = tmp_path / "scripts"
+        scripts_dir.mkdir()
+        count = ScriptIndex.PARALLEL_PARSE_MIN_FILES + 8
+        for i in range(count):
+            (scripts_dir / f"job-{i:03d}.sh").write_text(f"#!/bin/bash\n# name: job-{i:03d}\necho {i}\n")
+
+        index = ScriptIndex(config_path=str(tmp_path / "sparkq.yml"))
+        index._load_config = lambda: {"script_dirs": [str(scripts_dir)]}
+        index.build()
+
+        assert sorted(entry["name"] for entry in index.list_all()) == [f"job-{i:03d}" for i in range(count)]
+        assert all(entry["name"] == Path(entry["path"]).stem for entry in index.list_all())
+
+    def test_persistent_cache_skips_parsing_in_fresh_instances(self, tmp_path: Path, monkeypatch):
+        scripts_dir = tmp_path / "scripts"
+        scripts_dir.mkdir()
+        (scripts_dir / "keep.sh").write_text("#!/bin/bash\n# name: keep\n# tags: a, b\necho keep\n")
+        (scripts_dir / "edit.sh").write_text("#!/bin/bash\n# name: edit-v1\necho edit\n")
+        config_path = tmp_path / "sparkq.yml"
+        config_path.write_text(f"script_dirs:\n  - {scripts_dir}\nscript_index_cache: index.sqlite\n")
+
+        ScriptIndex(config_path=str(config_path)).build()
+        assert (tmp_path / "index.sqlite").exists()
+
+        (scripts_dir / "edit.sh").write_text("#!/bin/bash\n# name: edit-version-2\necho edit\n")
+        parsed = []
+        original = ScriptIndex._read_header_bytes
+
+        def tracking_read(self, file_path):
+            parsed.append(Path(file_path).name)
+            return original(self, file_path)
+
+        monkeypatch.setattr(ScriptIndex, "_read_header_bytes", tracking_read)
+        fresh = ScriptIndex(config_path=str(config_path))
+        fresh.build()
+
+        assert parsed == ["edit.sh"]
+        assert fresh.get_script("keep")["tags"] == ["a", "b"]
+        assert fresh.get_script("edit-version-2") is not None
+
+    def test_corrupt_persistent_cache_row_is_ignored(self, tmp_path: Path, caplog):
+        scripts_dir = tmp_path / "scripts"
+        scripts_dir.mkdir()
+        (scripts_dir / "keep.sh").write_text("#!/bin/bash\n# name: keep\necho keep\n")
+        config_path = tmp_path / "sparkq.yml"
+        config_path.write_text(f"script_dirs:\n  - {scripts_dir}\nscript_index_cache: index.sqlite\n")
+        ScriptIndex(config_path=str(config_path)).build()
+
+        with sqlite3.connect(tmp_path / "index.sqlite") as conn:
+            conn.execute("UPDATE scripts SET entry_json = '{not json'")
+        conn.close()
+
+        fresh = ScriptIndex(config_path=str(config_path))
+        with caplog.at_level(logging.WARNING):
+            fresh.build()
+
+        assert "unreadable script index cache" in caplog.text
+        assert fresh.get_script("keep") is not None
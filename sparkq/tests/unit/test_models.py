@@ -230,3 +230,24 @@ class TestTaskModel:
         to_json = task.model_dump_json if hasattr(task, "model_dump_json") else task.json
         serialized_json = json.loads(to_json())
         assert serialized_json["payload"] == payload_json
+
+    def test_task_payload_obj_parses_once_per_payload(self):
+        timestamp = datetime.now(UTC)
+        task = Task(
+            id="tsk_cafef00d",
+            queue_id="que_cafef00d",
+            tool_name="sql_runner",
+            task_class=TaskClass.LLM_LITE,
+            payload='{"query": "SELECT 1"}',
+            timeout=120,
+            created_at=timestamp,
+            updated_at=timestamp,
+        )
+
+        first = task.payload_obj
+        assert first == {"query": "SELECT 1"}
+        assert task.payload_obj is first
+        assert "_payload_cache" not in task.model_dump()
+
+        task.payload = '{"query": "SELECT 2"}'
+        assert task.payload_obj == {"query": "SELECT 2"}
@@ -1,11 +1,15 @@
+import json
+import re
 import types
-from datetime import datetime
 from pathlib import Path
 
 import pytest
 
 from sparkq import queue_runner
 from sparkq.queue_runner import process_one
+from src import config
+
+_CLAIM_RE = re.compile(r"/tasks/(?P<task>[^/]+)/claim$")
 
 
 class MockResponse:
@@ -21,37 +25,48 @@ class MockResponse:
             raise RuntimeError(f"HTTP {self.status_code}")
 
 
+# Shared canned responses for the fakes' fixed-content branches (never mutated)
+_RESP_EMPTY = MockResponse()
+_RESP_EMPTY_QUEUES = MockResponse(json_data={"queues": []})
+_RESP_EMPTY_TASK = MockResponse(json_data={"task": {}})
+
+
+def install_http_mocks(monkeypatch, get_fn, post_fn):
+    """Route every runner HTTP entry point (requests.get/post and _http_request) to the fakes."""
+
+    def fake_request(method, url, **kwargs):
+        if method.upper() == "GET":
+            return get_fn(url, **kwargs)
+        return post_fn(url, **kwargs)
+
+    monkeypatch.setattr(queue_runner.requests, "get", get_fn)
+    monkeypatch.setattr(queue_runner.requests, "post", post_fn)
+    monkeypatch.setattr(queue_runner, "_http_request", fake_request)
+
+
 @pytest.fixture
 def mock_requests(monkeypatch):
-    """Mock requests.get/post to simulate API calls."""
-    history = {"get": [], "post": []}
+    """Mock runner HTTP calls; tests put task dicts in history["tasks"] to serve from /api/tasks."""
+    history = {"get": [], "post": [], "tasks": []}
 
     def fake_get(url, *args, **kwargs):
         history["get"].append((url, kwargs))
         if url.endswith("/api/queues"):
-            return MockResponse(json_data={"queues": []})
+            return _RESP_EMPTY_QUEUES
         if url.endswith("/api/tasks"):
-            tasks = kwargs.get("params", {}).get("tasks_data", [])
-            # Not used; we'll inject via closure below
-        return MockResponse(json_data={})
+            return MockResponse(json_data={"tasks": history["tasks"]})
+        return _RESP_EMPTY
 
     def fake_post(url, *args, **kwargs):
         history["post"].append((url, kwargs))
         # Claim endpoint returns task
-        if "/claim" in url:
-            task_id = url.split("/")[-2]
-            return MockResponse(json_data={"task": {"id": task_id}})
+        claim = _CLAIM_RE.search(url)
+        if claim:
+            return MockResponse(json_data={"task": {"id": claim.group("task")}})
         # Complete/fail endpoints
-        return MockResponse(json_data={"task": {}})
+        return _RESP_EMPTY_TASK
 
-    def fake_request(method, url, **kwargs):
-        if method.upper() == "GET":
-            return fake_get(url, **kwargs)
-        return fake_post(url, **kwargs)
-
-    monkeypatch.setattr("sparkq.queue_runner.requests.get", fake_get)
-    monkeypatch.setattr("sparkq.queue_runner.requests.post", fake_post)
-    monkeypatch.setattr("sparkq.queue_runner._http_request", fake_request)
+    install_http_mocks(monkeypatch, fake_get, fake_post)
     return history
 
 
@@ -81,6 +96,29 @@ def test_request_with_retry_recovers_on_5xx(monkeypatch):
     assert len(calls) == 2
 
 
+def test_request_with_retry_jitters(monkeypatch):
+    sleeps = []
+
+    def fake_request(method, url, **kwargs):
+        return MockResponse(status_code=503)
+
+    monkeypatch.setattr(queue_runner, "_http_request", fake_request)
+    monkeypatch.setattr(queue_runner.time, "sleep", sleeps.append)
+    monkeypatch.setattr(queue_runner.random, "uniform", lambda low, high: 0.25)
+
+    with pytest.raises(RuntimeError):
+        queue_runner._request_with_retry(
+            "GET",
+            "http://localhost/api/test",
+            retries=4,
+            backoff_seconds=2.0,
+            max_delay=20.0,
+            context={"case": "jitter"},
+        )
+
+    assert sleeps == [2.5, 5.0, 10.0, 20.0]
+
+
 def test_request_with_retry_allows_status(monkeypatch):
     calls = []
 
@@ -122,30 +160,37 @@ def test_request_with_retry_raises_after_retries(monkeypatch):
         )
 
 
-def test_process_one_picks_oldest_and_completes(monkeypatch, mock_requests):
+def test_request_with_retry_uses_shared_session_by_default(monkeypatch):
+    calls = []
+
+    def fake_session_request(method, url, **kwargs):
+        calls.append((method, url))
+        return MockResponse(status_code=200, json_data={"ok": True})
+
+    monkeypatch.setattr(queue_runner._HTTP_SESSION, "request", fake_session_request)
+
+    resp = queue_runner._request_with_retry("GET", "http://localhost/api/test", retries=0)
+
+    assert resp.status_code == 200
+    assert calls == [("GET", "http://localhost/api/test")]
+
+
+def test_json_decodes_body_bytes_and_falls_back_to_response_json():
+    body = b'{"tasks": [{"id": "tsk_1"}]}'
+    raw = types.SimpleNamespace(content=body, json=lambda: json.loads(body))
+    assert queue_runner._json(raw) == {"tasks": [{"id": "tsk_1"}]}
+
+    # Responses without a bytes body (e.g. test doubles) use their own json()
+    assert queue_runner._json(MockResponse(json_data={"ok": True})) == {"ok": True}
+
+
+def test_process_one_picks_oldest_and_completes(mock_requests):
     # Prepare two tasks, ensure oldest (created_at) is selected
-    tasks = [
+    mock_requests["tasks"] = [
         {"id": "tsk_new", "status": "queued", "created_at": "2025-11-30T12:00:00Z", "payload": {"prompt": "newer"}},
         {"id": "tsk_old", "status": "queued", "created_at": "2025-11-30T10:00:00Z", "payload": {"prompt": "older"}},
     ]
 
-    def fake_get(url, *args, **kwargs):
-        mock_requests["get"].append((url, kwargs))
-        if url.endswith("/api/tasks"):
-            return MockResponse(json_data={"tasks": tasks})
-        return MockResponse(json_data={"queues": []})
-
-    def fake_post(url, *args, **kwargs):
-        mock_requests["post"].append((url, kwargs))
-        if "/claim" in url:
-            task_id = url.split("/")[-2]
-            return MockResponse(json_data={"task": {"id": task_id}})
-        return MockResponse(json_data={"task": {}})
-
-    monkeypatch.setattr("sparkq.queue_runner.requests.get", fake_get)
-    monkeypatch.setattr("sparkq.queue_runner.requests.post", fake_post)
-    monkeypatch.setattr("sparkq.queue_runner._http_request", lambda method, url, **kwargs: fake_get(url, **kwargs) if method.upper() == "GET" else fake_post(url, **kwargs))
-
     queue = {"id": "que_123", "name": "TestQ"}
     did_work = process_one("http://localhost:5005", queue, "worker-1", execute=False)
 
@@ -155,6 +200,8 @@ def test_process_one_picks_oldest_and_completes(monkeypatch, mock_requests):
     complete_calls = [u for u, _ in mock_requests["post"] if "/complete" in u]
     assert claim_calls[0].endswith("/tsk_old/claim")
     assert complete_calls[0].endswith("/tsk_old/complete")
+    task_fetches = [kw for u, kw in mock_requests["get"] if u.endswith("/api/tasks")]
+    assert task_fetches[0]["params"] == {"queue_id": "que_123", "status": "queued"}
 
 
 def test_acquire_lock_uses_env_dir_and_blocks_duplicate(tmp_path, monkeypatch):
@@ -179,13 +226,9 @@ def test_acquire_lock_cleans_stale_lock(tmp_path, monkeypatch):
     queue_runner.LOCK_FILE = None
 
     stale_path = Path(tmp_path) / "sparkq-runner-que_stale.lock"
+    # Left behind by a crashed runner: the file exists but nobody holds its flock
     stale_path.write_text("999999")
 
-    def fake_kill(pid, sig):
-        raise OSError("not running")
-
-    monkeypatch.setattr(queue_runner.os, "kill", fake_kill)
-
     queue_runner.acquire_lock("que_stale")
 
     assert stale_path.exists()
@@ -206,3 +249,39 @@ def test_get_lock_dir_prefers_config(monkeypatch, tmp_path):
     assert lock_path.parent == tmp_path
 
     queue_runner.release_lock()
+
+
+def test_adaptive_poll_interval_shrinks_on_hit():
+    delays = []
+    delay = 30.0
+    for did_work in (False, False, False, False, True, True, True):
+        delay = queue_runner._next_poll_delay(delay, did_work, min_s=30.0, max_s=120.0)
+        delays.append(delay)
+
+    assert delays == [60.0, 120.0, 120.0, 120.0, 60.0, 30.0, 30.0]
+
+
+def test_load_queue_runner_config_is_cached(monkeypatch, tmp_path):
+    config_path = tmp_path / "sparkq.yml"
+    config_path.write_text("queue_runner:\n  poll_interval: 10\n")
+    monkeypatch.setenv("SPARKQ_CONFIG", str(config_path))
+    config._parse_config_cached.cache_clear()
+
+    calls = []
+    real_parse_config = config.parse_config
+
+    def counting_parse_config(data, source):
+        calls.append(source)
+        return real_parse_config(data, source)
+
+    monkeypatch.setattr(config, "parse_config", counting_parse_config)
+
+    first = queue_runner.load_queue_runner_config()
+    first["poll_interval"] = 99
+    assert queue_runner.load_queue_runner_config() == {"poll_interval": 10}
+    assert len(calls) == 1
+
+    config_path.write_text("queue_runner:\n  poll_interval: 20\n")
+
+    assert queue_runner.load_queue_runner_config() == {"poll_interval": 20}
+    assert len(calls) == 2
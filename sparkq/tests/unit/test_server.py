@@ -23,8 +23,7 @@ def temp_lockfile(tmp_path, monkeypatch):
     lockfile = tmp_path / "test.lock"
     monkeypatch.setattr("src.server.LOCKFILE_PATH", lockfile)
     yield lockfile
-    if lockfile.exists():
-        lockfile.unlink()
+    lockfile.unlink(missing_ok=True)
 
 
 class TestLockfileOperations:
@@ -38,6 +37,16 @@ class TestLockfileOperations:
         content = temp_lockfile.read_text().strip()
         assert content == str(os.getpid())
 
+    def test_create_lockfile_refuses_existing_lockfile(self, temp_lockfile, monkeypatch):
+        monkeypatch.setattr("src.server.LOCKFILE_PATH", temp_lockfile)
+        temp_lockfile.write_text("12345")
+
+        with pytest.raises(RuntimeError, match="already exists"):
+            create_lockfile()
+
+        assert temp_lockfile.read_text() == "12345"
+        assert list(temp_lockfile.parent.iterdir()) == [temp_lockfile]
+
     def test_get_pid_from_lockfile_returns_pid(self, temp_lockfile, monkeypatch):
         monkeypatch.setattr("src.server.LOCKFILE_PATH", temp_lockfile)
         test_pid = 12345
@@ -88,6 +97,13 @@ class TestProcessChecking:
     def test_is_process_running_returns_false_for_nonexistent_pid(self):
         assert is_process_running(999999) is False
 
+    def test_is_process_running_treats_eperm_as_running(self, monkeypatch):
+        def fake_kill(pid, sig):
+            raise PermissionError("operation not permitted")
+
+        monkeypatch.setattr("src.server.os.kill", fake_kill)
+        assert is_process_running(1) is True
+
     def test_check_server_running_returns_none_without_lockfile(self, temp_lockfile, monkeypatch):
         monkeypatch.setattr("src.server.LOCKFILE_PATH", temp_lockfile)
         pid = check_server_running()
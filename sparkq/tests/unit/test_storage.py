@@ -4,6 +4,7 @@ import time
 import pytest
 
 from src.errors import ValidationError
+from src.storage import Storage
 
 class TestStorageInit:
     def test_creates_expected_tables(self, storage):
@@ -12,11 +13,18 @@ class TestStorageInit:
         table_names = {row["name"] for row in rows}
         assert {"projects", "sessions", "queues", "tasks"}.issubset(table_names)
 
-    def test_enables_wal_mode(self, storage):
-        with storage.connection() as conn:
+    def test_enables_wal_mode(self, file_storage):
+        with file_storage.connection() as conn:
             row = conn.execute("PRAGMA journal_mode").fetchone()
         assert row[0].lower() == "wal"
 
+    def test_accepts_sqlite_uri(self, memory_db_uri):
+        store = Storage(memory_db_uri)
+        assert store.db_path == memory_db_uri
+        store.init_db()
+        session = store.create_session(name="uri-session")
+        assert store.get_session(session["id"])["name"] == "uri-session"
+
 
 class TestProjectOperations:
     def test_create_project_persists_record(self, storage):
@@ -251,17 +259,13 @@ class TestTaskOperations:
         )
 
         with storage.connection() as conn:
-            conn.execute(
-                "UPDATE tasks SET created_at = ? WHERE id = ?",
-                ("2024-01-01T00:00:00Z", first["id"]),
-            )
-            conn.execute(
+            conn.executemany(
                 "UPDATE tasks SET created_at = ? WHERE id = ?",
-                ("2024-01-01T00:00:01Z", second["id"]),
-            )
-            conn.execute(
-                "UPDATE tasks SET created_at = ? WHERE id = ?",
-                ("2024-01-01T00:00:02Z", third["id"]),
+                [
+                    ("2024-01-01T00:00:00Z", first["id"]),
+                    ("2024-01-01T00:00:01Z", second["id"]),
+                    ("2024-01-01T00:00:02Z", third["id"]),
+                ],
             )
 
         oldest = storage.get_oldest_queued_task(queue["id"])
@@ -444,6 +448,55 @@ class TestTaskOperations:
         assert stats[queue["id"]]["queued"] == 1
         assert stats[queue["id"]]["done"] == 0
 
+    def test_count_tasks_filters_by_queue_and_status(self, storage, queue):
+        first = storage.create_task(queue_id=queue["id"], tool_name="t1", task_class="A", payload="{}", timeout=10)
+        storage.create_task(queue_id=queue["id"], tool_name="t2", task_class="B", payload="{}", timeout=10)
+        storage.claim_task(first["id"])
+
+        assert storage.count_tasks(queue_id=queue["id"]) == 2
+        assert storage.count_tasks(queue_id=queue["id"], status="running") == 1
+        assert storage.count_tasks(queue_id="que_missing") == 0
+
+    def test_get_full_task_nests_queue_and_session(self, storage, session, queue):
+        task = storage.create_task(queue_id=queue["id"], tool_name="t1", task_class="A", payload="{}", timeout=10)
+
+        full = storage.get_full_task(task["id"])
+
+        assert full["task"] == storage.get_task(task["id"])
+        assert full["queue"] == storage.get_queue(queue["id"])
+        assert full["session"] == storage.get_session(session["id"])
+        assert storage.get_full_task("tsk_missing") is None
+
+    def test_bulk_transaction_commits_once_on_exit(self, file_storage):
+        # On disk: a shared-cache memory DB would block the outside reader instead of isolating it
+        session = file_storage.create_session(name="bulk-session")
+        queue = file_storage.create_queue(session_id=session["id"], name="bulk-queue")
+        with file_storage.bulk_transaction():
+            for i in range(5):
+                file_storage.create_task(queue["id"], f"bulk-tool-{i}", "FAST_SCRIPT", "{}", 30)
+            with sqlite3.connect(file_storage.db_path) as other:
+                assert other.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] == 0
+
+        assert len(file_storage.list_tasks(queue_id=queue["id"])) == 5
+
+    def test_bulk_transaction_rolls_back_on_error(self, storage, queue):
+        with pytest.raises(RuntimeError):
+            with storage.bulk_transaction():
+                storage.create_task(queue["id"], "bulk-tool", "FAST_SCRIPT", "{}", 30)
+                raise RuntimeError("boom")
+
+        assert storage.list_tasks(queue_id=queue["id"]) == []
+
+    def test_bulk_transaction_keeps_original_error_when_rollback_fails(self, storage, queue):
+        with pytest.raises(RuntimeError, match="boom"):
+            with storage.bulk_transaction() as conn:
+                storage.create_task(queue["id"], "bulk-tool", "FAST_SCRIPT", "{}", 30)
+                # End the transaction early so bulk_transaction's own ROLLBACK errors
+                conn.execute("ROLLBACK")
+                raise RuntimeError("boom")
+
+        assert storage.list_tasks(queue_id=queue["id"]) == []
+
 
 class TestTaskCounts:
     def test_count_tasks_by_status(self, storage, queue):
@@ -9,7 +9,7 @@ PROJECT_ROOT = Path(__file__).resolve().parents[3]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from src import tools
+from src import config, tools
 from src.constants import DEFAULT_TOOL_TIMEOUT_SECONDS, TASK_CLASS_TIMEOUTS
 from src.tools import ToolRegistry, reload_registry
 
@@ -111,3 +111,28 @@ class TestToolRegistry:
         assert script_index["description"] == "Index repository scripts"
         assert reloaded.get_task_class("script-index") == "FAST_SCRIPT"
         assert reloaded.get_timeout("script-index") == DEFAULT_CONFIG["task_classes"]["FAST_SCRIPT"]["timeout"]
+
+    def test_reload_registry_reuses_parse_for_unchanged_config(self, temp_config, monkeypatch):
+        config._parse_config_cached.cache_clear()
+        calls = []
+        real_parse_config = config.parse_config
+
+        def counting_parse_config(data, source):
+            calls.append(source)
+            return real_parse_config(data, source)
+
+        monkeypatch.setattr(config, "parse_config", counting_parse_config)
+
+        first = reload_registry()
+        second = reload_registry()
+        assert len(calls) == 1
+        assert first is not second
+        assert first.tools is not second.tools
+
+        updated_config = yaml.safe_load(temp_config.read_text())
+        updated_config["tools"]["script-index"] = {"description": "Index", "task_class": "FAST_SCRIPT"}
+        temp_config.write_text(yaml.safe_dump(updated_config))
+
+        third = reload_registry()
+        assert len(calls) == 2
+        assert "script-index" in third.list_tools()